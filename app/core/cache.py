@@ -0,0 +1,77 @@
+# app/core/cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core.config import AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_SIZE
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Small in-process cache with per-entry expiry and LRU eviction once `max_size` is reached.
+    Not shared between worker processes; every worker keeps its own copy.
+    """
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float | None = None):
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Verified JWT claims keyed by the raw token, so repeat requests skip signature checks
+token_claims_cache = TTLCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS)
+# Pydantic `User` snapshots keyed by user id, so the auth check skips the users table
+user_cache = TTLCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: int):
+    """
+    Drop a user's cached snapshot. Call after any mutation of that user.
+    """
+    user_cache.invalidate(user_id)
@@ -4,6 +4,115 @@ Core configuration module for the application.
 import os
 
 # JWT Settings
-SECRET_KEY = os.getenv("SECRET_KEY", "your-very-secret-key")  # Default secret key if not in env
-ALGORITHM = "HS256"
+SECRET_KEY = os.getenv("SECRET_KEY", "your-very-secret-key")  # Default secret key if not in env (HS256 only)
+ALGORITHM = os.getenv("JWT_ALGORITHM", "EdDSA")  # "EdDSA" or "RS256" (asymmetric, published as JWKS) or legacy "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60  # 1 hour expiration
+JWT_KEYS_DIR = os.getenv(  # private signing keys, one <kid>.pem per key; never commit these
+    "JWT_KEYS_DIR", os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "keys"))
+)
+JWT_KEY_ROTATION_DAYS = float(os.getenv("JWT_KEY_ROTATION_DAYS", "30"))  # sign with a new key this often
+JWT_KEY_PREPUBLISH_SECONDS = int(os.getenv("JWT_KEY_PREPUBLISH_SECONDS", "3600"))  # new keys appear in JWKS this long before use
+JWT_KEYS_RELOAD_SECONDS = int(os.getenv("JWT_KEYS_RELOAD_SECONDS", "300"))  # how often workers re-read JWT_KEYS_DIR
+JWKS_MAX_AGE_SECONDS = int(os.getenv("JWKS_MAX_AGE_SECONDS", "900"))  # Cache-Control for /.well-known/jwks.json
+
+# Password hashing scheme and cost (tune with `python -m app.core.password_hashing calibrate`)
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")  # "bcrypt" or "argon2" (needs argon2-cffi)
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "3"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "65536"))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "2"))
+
+# Password hashing worker pool
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # "thread" or "process"
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))  # waiting jobs before 503
+
+# Authenticated-user cache (used by get_current_user)
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+
+# Pagination for GET /users/
+USERS_PAGE_DEFAULT_LIMIT = int(os.getenv("USERS_PAGE_DEFAULT_LIMIT", "50"))
+USERS_PAGE_MAX_LIMIT = int(os.getenv("USERS_PAGE_MAX_LIMIT", "200"))
+
+# Bulk user creation (POST /users/bulk)
+USERS_BULK_MAX_SIZE = int(os.getenv("USERS_BULK_MAX_SIZE", "10000"))
+
+# Logging
+APP_ENV = os.getenv("APP_ENV", "development")  # "development", "staging" or "production"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO" if APP_ENV == "production" else "DEBUG").upper()
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "true").lower() == "true"  # format/write on a background thread
+LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", "10000"))  # records beyond this are dropped and counted
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))  # fraction of DEBUG/INFO records kept
+
+# Server launcher (python -m app.server)
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "0"))  # 0 = one per CPU
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))  # pending connections the kernel queues
+SERVER_KEEPALIVE_SECONDS = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "5"))  # keep above the load balancer's idle timeout
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))  # recycle a worker after this many requests, 0 = never
+SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "0"))  # spread recycling so workers don't restart together
+SERVER_GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv("SERVER_GRACEFUL_SHUTDOWN_SECONDS", "30"))  # drain in-flight requests
+SERVER_SHUTDOWN_DELAY_SECONDS = float(os.getenv("SERVER_SHUTDOWN_DELAY_SECONDS", "0"))  # keep serving with /ready failing after SIGTERM
+SERVER_ACCESS_LOG = os.getenv("SERVER_ACCESS_LOG", "false").lower() == "true"  # the app already logs every request
+# Behind a reverse proxy / load balancer: take the client address from X-Forwarded-For and
+# X-Forwarded-Proto, but only on connections from these peers (comma-separated IPs/CIDRs,
+# "*" trusts everyone). The per-IP login rate limit keys on that address, so list exactly
+# the proxies' addresses; otherwise every client shares the proxy's bucket or can spoof its own.
+SERVER_PROXY_HEADERS = os.getenv("SERVER_PROXY_HEADERS", "true").lower() == "true"
+SERVER_FORWARDED_ALLOW_IPS = os.getenv("SERVER_FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# Request instrumentation
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"  # add a Server-Timing header
+
+# On-demand request profiling (off unless enabled; see app/middleware/profiling.py)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")  # X-Profile header value that triggers a profile, empty = header disabled
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # fraction of requests profiled at random
+PROFILING_DIR = os.getenv("PROFILING_DIR", "")  # default: logs/profiles
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "200"))
+PROFILING_MAX_BYTES = int(os.getenv("PROFILING_MAX_BYTES", str(100 * 1024 * 1024)))  # total size of kept profiles
+PROFILING_RETENTION_HOURS = float(os.getenv("PROFILING_RETENTION_HOURS", "72"))
+
+# Database engine and connection pool
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"  # log every SQL statement (debug only)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))  # asyncpg prepared statements per connection, 0 behind pgbouncer
+
+# SQL instrumentation (app/core/sql_stats.py)
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))  # log statements slower than this, 0 = off
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))  # flag a request running one statement this often, 0 = off
+
+# Read replicas (DATABASE_REPLICA_URLS is read in app.database)
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))  # how long a failed replica is skipped
+REPLICA_PROBE_TIMEOUT = float(os.getenv("REPLICA_PROBE_TIMEOUT", "2"))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))  # a client's reads stay on the primary after its write, 0 disables
+READ_YOUR_WRITES_COOKIE = os.getenv("READ_YOUR_WRITES_COOKIE", "pep2_primary_until")  # carries that window between requests
+
+# Login throttling (token bucket per email and per client IP)
+LOGIN_RATE_LIMIT_ENABLED = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() == "true"
+LOGIN_RATE_LIMIT_PER_EMAIL = int(os.getenv("LOGIN_RATE_LIMIT_PER_EMAIL", "5"))  # attempts per period
+LOGIN_RATE_LIMIT_PER_IP = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "20"))  # attempts per period
+LOGIN_RATE_LIMIT_PERIOD_SECONDS = float(os.getenv("LOGIN_RATE_LIMIT_PERIOD_SECONDS", "60"))
+LOGIN_RATE_LIMIT_MAX_KEYS = int(os.getenv("LOGIN_RATE_LIMIT_MAX_KEYS", "100000"))  # in-memory buckets kept
+
+# Serialization
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"  # skip re-validation on list endpoints, encode with orjson
+
+# Schema management (see app/migrations.py)
+DB_SCHEMA_CHECK_STRICT = os.getenv("DB_SCHEMA_CHECK_STRICT", "false").lower() == "true"  # refuse to start on a schema mismatch
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() == "true"  # run migrations on startup (dev only)
+
+# Batch lookup (POST /users/lookup)
+USERS_LOOKUP_MAX_IDS = int(os.getenv("USERS_LOOKUP_MAX_IDS", "200"))
+
+# Streaming export (GET /users/export): rows fetched per server-side cursor round trip
+USERS_EXPORT_BATCH_SIZE = int(os.getenv("USERS_EXPORT_BATCH_SIZE", "1000"))
+
+# User search (GET /users/search); trigram indexes can't serve shorter queries
+USERS_SEARCH_MIN_LENGTH = 3
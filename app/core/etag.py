@@ -0,0 +1,55 @@
+# app/core/etag.py
+"""
+ETag / Last-Modified helpers for conditional GETs on user resources.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable
+
+from fastapi import Request
+
+def user_etag(user_id: int, version: int) -> str:
+    return f'"u{user_id}-v{version}"'
+
+def page_etag(rows: Iterable[tuple[int, int]]) -> str:
+    """
+    Strong ETag for a page, from its (id, version) pairs: changes whenever a row on
+    the page changes, or rows enter or leave it.
+    """
+    digest = hashlib.sha1(",".join(f"{i}:{v}" for i, v in rows).encode()).hexdigest()[:20]
+    return f'"p{digest}"'
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+def validator_headers(etag: str, last_modified: datetime | None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """
+    Evaluate If-None-Match (which wins when present) and If-Modified-Since per RFC 9110.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
@@ -0,0 +1,25 @@
+# app/core/fast_json.py
+"""
+JSON encoding for the fast response path: orjson when installed, stdlib json otherwise.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with `dumps`; a drop-in default_response_class.
+    """
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
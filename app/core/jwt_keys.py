@@ -0,0 +1,299 @@
+# app/core/jwt_keys.py
+"""
+JWT signing keys with rotation, selected by `kid`.
+
+Keys are PEM files named `<kid>.pem` in JWT_KEYS_DIR, where the kid starts with the
+UTC time the key becomes active for signing (e.g. `20260101T000000Z-3f9a`). So
+every worker reading the same directory agrees on which key signs and which verify:
+  - the newest key whose activation time has passed signs new tokens;
+  - keys activating in the future are already published in the JWKS, so other
+    services have them cached before the first token signed with them shows up;
+  - an old key is kept for verification until tokens it signed have expired.
+A new key is generated JWT_KEY_PREPUBLISH_SECONDS ahead whenever the signing key is
+older than JWT_KEY_ROTATION_DAYS, or on demand with `python -m app.core.jwt_keys rotate`.
+
+Keys are only ever generated by `ensure_keys`, under an exclusive lock on the key
+directory and after re-reading it, so workers starting or rotating together agree on
+one key. It runs in the startup hook and in a background refresh task (off the event
+loop); the request path (`encode`/`decode`/`jwks`) only reads what is in memory.
+"""
+import asyncio
+import json
+import os
+import secrets
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: single-process deployments only
+    fcntl = None
+
+from app.core.config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, JWT_KEYS_DIR, JWT_KEY_ROTATION_DAYS,
+    JWT_KEY_PREPUBLISH_SECONDS, JWT_KEYS_RELOAD_SECONDS,
+)
+from app.logger import get_logger
+
+logger = get_logger("pep2-backend")
+
+_KID_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    activates_at: float  # unix time
+    private_key: object
+    public_key: object
+
+def _kid_activation(kid: str) -> float:
+    return datetime.strptime(kid.split("-", 1)[0], _KID_TIME_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+
+def _new_private_key(algorithm: str):
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    raise ValueError(f"Unsupported JWT algorithm for key generation: {algorithm}")
+
+def _public_jwk(key: SigningKey) -> dict:
+    to_jwk = OKPAlgorithm.to_jwk if key.algorithm == "EdDSA" else RSAAlgorithm.to_jwk
+    return {**to_jwk(key.public_key, as_dict=True), "kid": key.kid, "alg": key.algorithm, "use": "sig"}
+
+class KeySet:
+    """
+    Preloaded signing/verification keys for this process. Verification looks the key
+    up by the token's `kid` header, it never tries keys one by one.
+    """
+    def __init__(
+        self,
+        keys_dir: str = JWT_KEYS_DIR,
+        algorithm: str = ALGORITHM,
+        rotation_days: float = JWT_KEY_ROTATION_DAYS,
+        prepublish_seconds: int = JWT_KEY_PREPUBLISH_SECONDS,
+        reload_seconds: int = JWT_KEYS_RELOAD_SECONDS,
+    ):
+        self.keys_dir = keys_dir
+        self.algorithm = algorithm
+        self.rotation_seconds = rotation_days * 86400
+        self.prepublish_seconds = prepublish_seconds
+        self.reload_seconds = reload_seconds
+        self._keys: dict[str, SigningKey] = {}
+        self._by_activation: list[SigningKey] = []  # loaded keys, oldest activation first
+        self._jwks: bytes = b'{"keys":[]}'
+        self._loaded = False
+        self._refresh_task: asyncio.Task | None = None
+        self._reload_requested: asyncio.Event | None = None
+        self._last_unknown_kid_reload = 0.0
+
+    # ─── Loading and rotation ───────────────────────────────────────────────
+    def load(self):
+        """
+        (Re)read the key directory into memory. Never generates a key.
+        """
+        if self.algorithm == "HS256":
+            # Legacy shared-secret mode: nothing to publish
+            key = SigningKey("hs256", "HS256", 0.0, SECRET_KEY, SECRET_KEY)
+            self._keys, self._by_activation = {key.kid: key}, [key]
+            self._jwks = b'{"keys":[]}'
+            self._loaded = True
+            return
+        keys = self._read_keys()
+        now = time.time()
+        signing = self._active_key(keys, now)
+        # Keep a retired key only while tokens it signed can still be valid
+        token_lifetime = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        keep = [
+            k for i, k in enumerate(keys)
+            if i + 1 >= len(keys) or keys[i + 1].activates_at + token_lifetime > now or k is signing
+        ]
+        self._keys = {k.kid: k for k in keep}
+        self._by_activation = keep
+        self._jwks = json.dumps({"keys": [_public_jwk(k) for k in keep]}, separators=(",", ":")).encode()
+        self._loaded = True
+
+    def ensure_keys(self):
+        """
+        Generate a key if none exists or rotation is due, then load. The check and the
+        write happen under an exclusive lock on the key directory, after re-reading it,
+        so concurrent workers generate one key between them. Blocking: run it off the loop.
+        """
+        if self.algorithm != "HS256":
+            with self._directory_lock():
+                keys = self._read_keys()
+                if self._rotation_due(keys):
+                    self.generate_key(activate_in=0 if not keys else self.prepublish_seconds)
+        self.load()
+
+    def _directory_lock(self):
+        os.makedirs(self.keys_dir, exist_ok=True)
+        return _FileLock(os.path.join(self.keys_dir, ".lock"))
+
+    @staticmethod
+    def _active_key(keys: list[SigningKey], now: float) -> SigningKey | None:
+        active = [k for k in keys if k.activates_at <= now]
+        return active[-1] if active else None
+
+    def _read_keys(self) -> list[SigningKey]:
+        os.makedirs(self.keys_dir, exist_ok=True)
+        keys = []
+        for filename in sorted(os.listdir(self.keys_dir)):
+            if not filename.endswith(".pem"):
+                continue
+            kid = filename[:-4]
+            with open(os.path.join(self.keys_dir, filename), "rb") as f:
+                private_key = serialization.load_pem_private_key(f.read(), password=None)
+            algorithm = "EdDSA" if isinstance(private_key, ed25519.Ed25519PrivateKey) else "RS256"
+            if algorithm != self.algorithm:
+                continue
+            keys.append(SigningKey(kid, algorithm, _kid_activation(kid), private_key, private_key.public_key()))
+        keys.sort(key=lambda k: (k.activates_at, k.kid))
+        return keys
+
+    def _rotation_due(self, keys: list[SigningKey]) -> bool:
+        if not keys:
+            return True
+        newest = keys[-1]
+        if newest.activates_at > time.time():
+            return False  # a successor is already scheduled
+        return time.time() - newest.activates_at >= self.rotation_seconds - self.prepublish_seconds
+
+    def generate_key(self, activate_in: float = 0) -> str:
+        """
+        Write a new private key that starts signing `activate_in` seconds from now.
+        """
+        activates_at = datetime.fromtimestamp(int(time.time() + activate_in), tz=timezone.utc)
+        kid = f"{activates_at.strftime(_KID_TIME_FORMAT)}-{secrets.token_hex(2)}"
+        pem = _new_private_key(self.algorithm).private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        os.makedirs(self.keys_dir, exist_ok=True)
+        path = os.path.join(self.keys_dir, f"{kid}.pem")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        os.replace(tmp_path, path)  # readers never see a half-written key
+        return kid
+
+    # ─── Background refresh ─────────────────────────────────────────────────
+    def start_refresh(self):
+        """
+        Re-run `ensure_keys` in a worker thread every `reload_seconds` (or sooner when a
+        token arrives with an unknown kid), for the lifetime of the event loop.
+        """
+        if self._refresh_task is None:
+            self._reload_requested = asyncio.Event()
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop_refresh(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._reload_requested.wait(), self.reload_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._reload_requested.clear()
+            try:
+                await asyncio.to_thread(self.ensure_keys)
+            except Exception as exc:
+                # Keep serving with the keys already loaded; the next round retries
+                logger.error(f"JWT key refresh failed: {exc!r}")
+
+    # ─── Use (in-memory only) ───────────────────────────────────────────────
+    def _require_loaded(self):
+        if not self._loaded:
+            raise RuntimeError("JWT keys not loaded; call key_set.ensure_keys() at startup")
+
+    def signing_key(self) -> SigningKey:
+        self._require_loaded()
+        # A pre-published key takes over at its activation time without a reload
+        key = self._active_key(self._by_activation, time.time())
+        if key is None:
+            raise RuntimeError(f"No active JWT signing key in {self.keys_dir}")
+        return key
+
+    def verification_key(self, kid: str | None) -> SigningKey | None:
+        self._require_loaded()
+        key = self._keys.get(kid)
+        if (
+            key is None
+            and self._reload_requested is not None
+            and time.monotonic() - self._last_unknown_kid_reload > 10
+        ):
+            # Another process may have just written a key: have the refresh task re-read
+            # the directory soon (at most every 10s) instead of doing file I/O here
+            self._last_unknown_kid_reload = time.monotonic()
+            self._reload_requested.set()
+        return key
+
+    def jwks(self) -> bytes:
+        """
+        Public keys as a JWKS document (pre-serialized).
+        """
+        self._require_loaded()
+        return self._jwks
+
+    def encode(self, claims: dict) -> str:
+        key = self.signing_key()
+        headers = None if key.algorithm == "HS256" else {"kid": key.kid}
+        return jwt.encode(claims, key.private_key, algorithm=key.algorithm, headers=headers)
+
+    def decode(self, token: str) -> dict:
+        """
+        Verify `token` with the key named by its `kid` header. Raises jwt.PyJWTError if invalid.
+        """
+        kid = jwt.get_unverified_header(token).get("kid", "hs256")
+        key = self.verification_key(kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown signing key id: {kid}")
+        return jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+
+
+class _FileLock:
+    """
+    Exclusive flock on `path` across processes (a no-op where fcntl is unavailable).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: int | None = None
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+
+key_set = KeySet()
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["rotate"]:
+        with key_set._directory_lock():
+            new_kid = key_set.generate_key(activate_in=key_set.prepublish_seconds)
+        print(f"Generated key {new_kid}; it starts signing in {key_set.prepublish_seconds}s")
+    else:
+        print("Usage: python -m app.core.jwt_keys rotate", file=sys.stderr)
+        sys.exit(2)
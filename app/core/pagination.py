@@ -0,0 +1,37 @@
+# app/core/pagination.py
+import base64
+import binascii
+import json
+
+from app.exceptions.http_exceptions import InvalidCursorException
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Encode the last id of a page as an opaque, URL-safe cursor.
+    """
+    raw = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decode a cursor produced by `encode_cursor`. Raises InvalidCursorException if it was tampered with.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+        raise InvalidCursorException()
+    if not isinstance(after, int) or isinstance(after, bool):
+        raise InvalidCursorException()
+    return after
+
+def next_page_headers(url, next_cursor: str | None) -> dict[str, str]:
+    """
+    Headers pointing at the next page of a list whose body is a bare JSON array:
+    `X-Next-Cursor` and an RFC 8288 `Link: <...>; rel="next"` (relative to the
+    request, so it stays right behind a proxy). Empty on the last page.
+    """
+    if next_cursor is None:
+        return {}
+    next_url = url.include_query_params(cursor=next_cursor)
+    return {"X-Next-Cursor": next_cursor, "Link": f'<{next_url.path}?{next_url.query}>; rel="next"'}
@@ -1,11 +1,201 @@
-# app/security/password_hashing.py
+# app/core/password_hashing.py
+"""
+The single place passwords are hashed and verified.
+
+Scheme and cost come from app.core.config. Hashes made with another scheme or
+cost still verify but report as outdated, so they can be rehashed on login.
+Pick a cost for this machine with:
+
+    python -m app.core.password_hashing calibrate --target-ms 250
+"""
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import (
+    PASSWORD_HASH_SCHEME, PASSWORD_BCRYPT_ROUNDS, PASSWORD_ARGON2_TIME_COST,
+    PASSWORD_ARGON2_MEMORY_COST, PASSWORD_ARGON2_PARALLELISM,
+    PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE,
+)
+from app.exceptions.http_exceptions import PasswordHashingBusyException
+
+SUPPORTED_SCHEMES = ("bcrypt", "argon2")
+
+def build_context(
+    scheme: str = PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = PASSWORD_BCRYPT_ROUNDS,
+    argon2_time_cost: int = PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_cost: int = PASSWORD_ARGON2_MEMORY_COST,
+    argon2_parallelism: int = PASSWORD_ARGON2_PARALLELISM,
+) -> CryptContext:
+    if scheme not in SUPPORTED_SCHEMES:
+        raise ValueError(f"Unknown password hash scheme: {scheme}")
+    # The configured scheme first (used for new hashes), the others only to verify old ones
+    schemes = [scheme] + [s for s in SUPPORTED_SCHEMES if s != scheme]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+pwd_context = build_context()
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password and, if it matches but the hash uses an outdated scheme or cost,
+    also return a fresh hash to store (otherwise None). One pool job for both.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def needs_update(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+class PasswordHashingPool:
+    """
+    Runs bcrypt work in a thread or process pool so it never blocks the event loop.
+    At most `workers` hashes run at once; up to `max_queue` more may wait for a slot,
+    anything beyond that is rejected with a 503 instead of piling up.
+    """
+    def __init__(self, kind: str = "thread", workers: int = 1, max_queue: int = 0):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password hashing executor: {kind}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Executor | None = None
+        self.pending = 0  # running + waiting jobs
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    async def run(self, func, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHashingBusyException()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def map(self, func, args_list: list[tuple]) -> list:
+        """
+        Run `func` over many argument tuples in parallel for batch jobs (bulk imports).
+        Work is fed to the executor one window of `workers` jobs at a time, so interactive
+        calls queued in between are not stuck behind the whole batch. Batch jobs are not
+        subject to the 503 admission check but do count towards the queue depth.
+        """
+        loop = asyncio.get_running_loop()
+        results = []
+        for start in range(0, len(args_list), self.workers):
+            window = args_list[start:start + self.workers]
+            self.pending += len(window)
+            try:
+                results += await asyncio.gather(
+                    *(loop.run_in_executor(self.executor, func, *args) for args in window)
+                )
+            finally:
+                self.pending -= len(window)
+                self.completed += len(window)
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self.pending, self.workers),
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hashing_pool = PasswordHashingPool(PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_pool.run(hash_password, password)
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    return await hashing_pool.map(hash_password, [(p,) for p in passwords])
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return await hashing_pool.run(verify_and_update, plain_password, hashed_password)
+
+# ─── Calibration ─────────────────────────────────────────────────────────────
+def _time_verify(context: CryptContext, samples: int) -> float:
+    hashed = context.hash("calibration-password")
+    start = time.perf_counter()
+    for _ in range(samples):
+        context.verify("calibration-password", hashed)
+    return (time.perf_counter() - start) / samples
+
+def calibrate(scheme: str, target_ms: float, samples: int = 3) -> tuple[str, int, float]:
+    """
+    Find the highest cost whose verify time on this machine stays within `target_ms`.
+    Returns (setting name, cost, measured ms).
+    """
+    if scheme == "bcrypt":
+        setting, costs = "PASSWORD_BCRYPT_ROUNDS", range(4, 32)
+        make = lambda cost: build_context("bcrypt", bcrypt_rounds=cost)
+    else:
+        setting, costs = "PASSWORD_ARGON2_TIME_COST", range(1, 64)
+        make = lambda cost: build_context("argon2", argon2_time_cost=cost)
+    best_cost, best_ms = costs[0], _time_verify(make(costs[0]), samples) * 1000
+    for cost in costs[1:]:
+        elapsed_ms = _time_verify(make(cost), samples) * 1000
+        if elapsed_ms > target_ms:
+            break
+        best_cost, best_ms = cost, elapsed_ms
+    return setting, best_cost, best_ms
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password hashing utilities")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    calibrate_parser = subcommands.add_parser("calibrate", help="pick a hash cost for a target verify time")
+    calibrate_parser.add_argument("--scheme", choices=SUPPORTED_SCHEMES, default=PASSWORD_HASH_SCHEME)
+    calibrate_parser.add_argument("--target-ms", type=float, default=250.0)
+    calibrate_parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    setting, cost, measured_ms = calibrate(args.scheme, args.target_ms, args.samples)
+    print(f"# verify takes ~{measured_ms:.0f} ms on this machine (target {args.target_ms:.0f} ms)")
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    print(f"{setting}={cost}")
+    sys.exit(0)
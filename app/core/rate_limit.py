@@ -0,0 +1,83 @@
+# app/core/rate_limit.py
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from app.core.config import (
+    LOGIN_RATE_LIMIT_ENABLED, LOGIN_RATE_LIMIT_PER_EMAIL, LOGIN_RATE_LIMIT_PER_IP,
+    LOGIN_RATE_LIMIT_PERIOD_SECONDS, LOGIN_RATE_LIMIT_MAX_KEYS,
+)
+from app.exceptions.http_exceptions import TooManyLoginAttemptsException
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets. The in-memory backend is per process; to share limits
+    between workers or hosts, implement `hit` atomically on a shared store
+    (e.g. a Redis Lua script keeping tokens and last-refill time per key).
+    """
+    @abstractmethod
+    async def hit(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """
+        Take one token from `key`'s bucket. Returns 0 if allowed, otherwise the
+        number of seconds until a token becomes available.
+        """
+
+class InMemoryTokenBucketBackend(RateLimitBackend):
+    def __init__(self, max_keys: int = LOGIN_RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (tokens, updated_at)
+
+    async def hit(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - updated_at) * refill_per_second)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / refill_per_second
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        # Forget the least recently seen clients rather than grow without bound
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+class LoginRateLimiter:
+    """
+    Throttles login attempts per email and per client IP before any password is verified,
+    so a rejected attempt costs a dict lookup instead of a bcrypt round.
+    """
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        per_email: int = LOGIN_RATE_LIMIT_PER_EMAIL,
+        per_ip: int = LOGIN_RATE_LIMIT_PER_IP,
+        period_seconds: float = LOGIN_RATE_LIMIT_PERIOD_SECONDS,
+        enabled: bool = LOGIN_RATE_LIMIT_ENABLED,
+    ):
+        self.backend = backend
+        self.per_email = per_email
+        self.per_ip = per_ip
+        self.period_seconds = period_seconds
+        self.enabled = enabled
+        self.rejected = 0
+
+    async def check(self, email: str, client_ip: str | None):
+        """
+        Raises TooManyLoginAttemptsException (429 + Retry-After) when either limit is exhausted.
+        """
+        if not self.enabled:
+            return
+        # IP first: an attacker spraying one address must not drain a victim's email
+        # bucket, so the email is only charged for attempts the IP limit lets through
+        limits = [(f"login:ip:{client_ip}", self.per_ip)] if client_ip else []
+        limits.append((f"login:email:{email.lower()}", self.per_email))
+        for key, capacity in limits:
+            retry_after = await self.backend.hit(key, capacity, capacity / self.period_seconds)
+            if retry_after > 0:
+                self.rejected += 1
+                raise TooManyLoginAttemptsException(retry_after=math.ceil(retry_after))
+
+login_rate_limiter = LoginRateLimiter(InMemoryTokenBucketBackend())
@@ -0,0 +1,54 @@
+# app/core/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+class _LeaderCancelled(Exception):
+    """The call everyone was waiting on was cancelled; followers retry on their own."""
+
+def _consume_exception(future: asyncio.Future):
+    # Avoid "exception was never retrieved" warnings when nobody else was waiting
+    if not future.cancelled():
+        future.exception()
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls by key: while a call for a key is in flight, other
+    callers for the same key await its result instead of doing the same work again.
+    Nothing is cached once the call finishes. Results are shared between callers, so
+    only use it for immutable values (e.g. Pydantic snapshots, not ORM objects).
+    """
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0  # calls that did the work
+        self.coalesced = 0  # calls that shared another call's result
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        in_flight = self._calls.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(in_flight)
+            except _LeaderCancelled:
+                return await self.do(key, func)
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._calls[key] = future
+        self.calls += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "calls": self.calls, "coalesced": self.coalesced}
@@ -0,0 +1,122 @@
+# app/core/sql_stats.py
+"""
+Per-request SQL accounting through engine events instead of echo=True.
+
+`instrument_engine` hooks an engine's cursor executions. While a request is being
+served (between `begin_request` and `end_request`, see the instrumentation middleware)
+each statement adds to a request-scoped QueryStats held in a contextvar. SQLAlchemy's
+async layer runs the sync engine in a greenlet of the calling task, which sees the same
+context, so the events land on the right request. Statements slower than SQL_SLOW_QUERY_MS
+are logged with redacted parameters whether or not a request is active.
+"""
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import SQL_SLOW_QUERY_MS, SQL_N_PLUS_ONE_THRESHOLD
+from app.core.metrics import registry
+from app.logger import get_logger
+
+logger = get_logger("pep2-backend")
+
+SLOW_QUERIES = registry.counter("db_slow_queries_total", "SQL statements slower than SQL_SLOW_QUERY_MS")
+N_PLUS_ONE = registry.counter(
+    "db_n_plus_one_total", "Requests that repeated one SQL statement SQL_N_PLUS_ONE_THRESHOLD+ times", ("route",)
+)
+
+class QueryStats:
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()  # statement text -> executions
+
+    def record(self, statement: str, seconds: float):
+        self.queries += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    @property
+    def time_ms(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+    def repeated_statement(self, threshold: int) -> tuple[str, int] | None:
+        """
+        The most repeated statement if it ran at least `threshold` times (an N+1 pattern).
+        """
+        if threshold <= 0 or not self.statements:
+            return None
+        statement, count = self.statements.most_common(1)[0]
+        return (statement, count) if count >= threshold else None
+
+_current: ContextVar[QueryStats | None] = ContextVar("sql_query_stats", default=None)
+
+def begin_request() -> Token:
+    return _current.set(QueryStats())
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+def end_request(token: Token, route: str) -> QueryStats:
+    """
+    Close the request's accounting and flag an N+1 pattern on `route` if there was one.
+    """
+    stats = _current.get()
+    _current.reset(token)
+    repeated = stats.repeated_statement(SQL_N_PLUS_ONE_THRESHOLD)
+    if repeated is not None:
+        statement, count = repeated
+        N_PLUS_ONE.inc(route)
+        logger.warning("Possible N+1 queries", extra={
+            "route": route, "statement": _shorten(statement), "executions": count, "db_queries": stats.queries,
+        })
+    return stats
+
+def redact_parameters(parameters):
+    """
+    Parameter shapes without values: {"email_1": "<str>"}, ["<int>"], or "<N rows>" for executemany.
+    """
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} rows>"
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return None if parameters is None else f"<{type(parameters).__name__}>"
+
+def _shorten(statement: str, limit: int = 1000) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if SQL_SLOW_QUERY_MS > 0 and elapsed * 1000 >= SQL_SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        logger.warning("Slow SQL query", extra={
+            "statement": _shorten(statement),
+            "parameters": redact_parameters(parameters),
+            "executemany": executemany,
+            "db_time_ms": round(elapsed * 1000, 2),
+        })
+
+def _handle_error(exception_context):
+    # A failed execution never reaches after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+def instrument_engine(engine: Engine):
+    """
+    Attach the accounting hooks to a sync Engine (`async_engine.sync_engine`).
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
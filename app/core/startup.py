@@ -0,0 +1,84 @@
+# app/core/startup.py
+"""
+Cold-start timings for this worker, measured from the moment app.main starts importing.
+Import this module first in app.main so the clock starts as early as possible.
+"""
+import signal
+import threading
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+class StartupTimer:
+    def __init__(self, started: float):
+        self.started = started
+        self.import_seconds: float | None = None
+        self.startup_seconds: float | None = None  # until the startup hook finished
+        self.first_request_seconds: float | None = None  # until the first response completed
+        self.stopping = False  # set when SIGINT/SIGTERM arrives, see stop_on_signals
+
+    def _elapsed(self) -> float:
+        return round(time.perf_counter() - self.started, 6)
+
+    def mark_imported(self):
+        self.import_seconds = self._elapsed()
+
+    def mark_started(self):
+        self.startup_seconds = self._elapsed()
+
+    def mark_stopping(self):
+        self.stopping = True
+
+    def stop_on_signals(self, delay_seconds: float = 0.0):
+        """
+        Chain onto the server's SIGINT/SIGTERM handlers so /ready fails as soon as the
+        signal arrives, before uvicorn closes the socket and drains (the shutdown hook
+        only runs after that). With `delay_seconds` the server keeps serving that long
+        before its own handler runs, so load balancers see /ready fail first; a second
+        signal shuts down at once. Call from the startup hook, in the main thread.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue  # no server handler installed (e.g. not run by uvicorn)
+
+            def handler(signum, frame, previous=previous):
+                first = not self.stopping
+                self.mark_stopping()
+                if first and delay_seconds > 0:
+                    timer = threading.Timer(delay_seconds, previous, (signum, frame))
+                    timer.daemon = True
+                    timer.start()
+                else:
+                    previous(signum, frame)
+
+            signal.signal(sig, handler)
+
+    @property
+    def ready(self) -> bool:
+        """
+        True between the end of the startup hook and the shutdown signal.
+        """
+        return self.startup_seconds is not None and not self.stopping
+
+    def mark_first_request(self) -> bool:
+        """
+        Record time to first request; returns True only the first time.
+        """
+        if self.first_request_seconds is not None:
+            return False
+        self.first_request_seconds = self._elapsed()
+        return True
+
+    def stats(self) -> dict:
+        return {
+            key: value for key, value in (
+                ("import_seconds", self.import_seconds),
+                ("startup_seconds", self.startup_seconds),
+                ("first_request_seconds", self.first_request_seconds),
+            ) if value is not None
+        }
+
+startup_timer = StartupTimer(IMPORT_STARTED)
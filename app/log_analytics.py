@@ -0,0 +1,348 @@
+# app/log_analytics.py
+"""
+Offline latency / error report over the JSON request logs:
+
+    python -m app.log_analytics                       # logs/app.log and its rotations
+    python -m app.log_analytics --window 15 --top 20  # 15-minute windows, 20 slowest requests
+    python -m app.log_analytics --format json archive/app.log.3.gz logs/app.log
+
+Files are streamed line by line (gzipped archives too), oldest rotation first. Latencies
+go into fixed-precision log histograms, so memory depends on the number of routes and
+windows, never on the number of requests. Older lines that only logged the URL are
+mapped onto the app's route templates, so each route is one row across the whole range.
+"""
+import argparse
+import glob
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from app.logger import LOG_FILE_PATH
+from app.middleware.instrumentation import UNMATCHED_ROUTE
+
+REQUEST_MESSAGE = "HTTP request completed"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"  # JsonFormatter's default formatTime
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram: percentiles within `precision` relative error in O(buckets) memory.
+    """
+    def __init__(self, precision: float = 0.01, min_value: float = 0.001):
+        self._log_base = math.log1p(precision)
+        self.min_value = min_value
+        self.buckets: dict[int, int] = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        index = int(math.log(max(value, self.min_value) / self.min_value) / self._log_base)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Upper edge of the bucket, capped by the largest value actually seen
+                return min(self.min_value * math.exp((index + 1) * self._log_base), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(self.max, 2),
+        }
+
+class RouteStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses: Counter = Counter()
+
+    def add(self, status_code, process_time_ms: float):
+        self.latency.add(process_time_ms)
+        self.statuses[str(status_code)] += 1
+
+    def summary(self) -> dict:
+        return {**self.latency.summary(), "statuses": dict(sorted(self.statuses.items()))}
+
+_NUMBERS = re.compile(r"\d+")
+
+class RouteMatcher:
+    """
+    Maps a request path onto the route template the app would have matched
+    ("/users/7" -> "/users/{user_id}"), trying routes in the order Starlette does.
+    """
+    def __init__(self, routes):
+        self._routes = [
+            (route.methods, route.path_regex, route.path)
+            for route in self._flatten(routes)
+            if getattr(route, "methods", None) and hasattr(route, "path_regex")
+        ]
+
+    @staticmethod
+    def _flatten(routes):
+        for route in routes:
+            # FastAPI keeps include_router()'d routes behind a wrapper that yields them
+            # with the include prefix applied
+            if hasattr(route, "effective_route_contexts"):
+                yield from route.effective_route_contexts()
+            else:
+                yield route
+
+    @classmethod
+    def for_app(cls) -> "RouteMatcher":
+        from app.main import app  # imported only when a log line lacks its route
+
+        return cls(app.routes)
+
+    def template(self, method: str, path: str) -> str:
+        for methods, path_regex, template in self._routes:
+            if method in methods and path_regex.match(path):
+                return template
+        return UNMATCHED_ROUTE
+
+def _error_source(record: dict) -> str:
+    # Ids and counts vary per occurrence; fold them so the same failure groups together
+    return f"{record.get('name', '?')}: {_NUMBERS.sub('N', str(record.get('message', '')))}"
+
+def _parse_timestamp(value) -> datetime | None:
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+class LogReport:
+    """
+    Accumulates request and error statistics from log records, one record at a time.
+    At most `max_error_sources` distinct error sources are tracked: past that the
+    rarest are dropped, so a flood of unique messages can't exhaust memory.
+    """
+    def __init__(
+        self,
+        window_minutes: int = 60,
+        top: int = 10,
+        route_matcher: RouteMatcher | None = None,
+        max_error_sources: int = 1000,
+    ):
+        self.window_seconds = window_minutes * 60
+        self.top = top
+        self._route_matcher = route_matcher  # built from the app on first need
+        self.max_error_sources = max(max_error_sources, top)
+        self.files: list[str] = []
+        self.lines = 0
+        self.malformed = 0
+        self.requests = 0
+        self.first_timestamp: datetime | None = None
+        self.last_timestamp: datetime | None = None
+        self.routes: dict[str, RouteStats] = defaultdict(RouteStats)
+        self.windows: dict[datetime, dict[str, RouteStats]] = defaultdict(lambda: defaultdict(RouteStats))
+        self._slowest: list[tuple[float, int, dict]] = []  # min-heap of the `top` slowest
+        self.server_errors: Counter = Counter()
+        self.error_sources: Counter = Counter()
+        self.error_sources_dropped = 0  # sources trimmed away, so their counts are lower bounds
+
+    def _route_of(self, record: dict) -> str:
+        """
+        "METHOD /template": the route template logged with the request, or for older
+        lines (which only logged the URL) the template the URL's path maps onto.
+        """
+        method = record.get("method", "?")
+        route = record.get("route")
+        if not route:
+            if self._route_matcher is None:
+                self._route_matcher = RouteMatcher.for_app()
+            path = urlsplit(record.get("url") or "").path or "/"
+            route = self._route_matcher.template(method, path)
+        return f"{method} {route}"
+
+    def _add_error(self, record: dict):
+        self.error_sources[_error_source(record)] += 1
+        if len(self.error_sources) > self.max_error_sources:
+            # Keep the most common half; their counts stay exact from here on
+            kept = self.error_sources.most_common(self.max_error_sources // 2)
+            self.error_sources_dropped += len(self.error_sources) - len(kept)
+            self.error_sources = Counter(dict(kept))
+
+    def _window_of(self, timestamp: datetime) -> datetime:
+        # Timestamps are naive local time; bucket them as-is rather than via the epoch
+        offset = (timestamp - datetime.min).total_seconds() % self.window_seconds
+        return (timestamp - timedelta(seconds=offset)).replace(microsecond=0)
+
+    def add_line(self, line: str):
+        self.lines += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            self.malformed += 1
+            return
+        if not isinstance(record, dict):
+            self.malformed += 1
+            return
+        timestamp = _parse_timestamp(record.get("timestamp"))
+        if timestamp is not None:
+            self.first_timestamp = min(self.first_timestamp or timestamp, timestamp)
+            self.last_timestamp = max(self.last_timestamp or timestamp, timestamp)
+        if record.get("level") in ("ERROR", "CRITICAL"):
+            self._add_error(record)
+        if record.get("message") != REQUEST_MESSAGE:
+            return
+        try:
+            process_time_ms = float(record["process_time_ms"])
+        except (KeyError, TypeError, ValueError):
+            self.malformed += 1
+            return
+
+        self.requests += 1
+        route = self._route_of(record)
+        status_code = record.get("status_code")
+        self.routes[route].add(status_code, process_time_ms)
+        if timestamp is not None:
+            self.windows[self._window_of(timestamp)][route].add(status_code, process_time_ms)
+        if str(status_code).startswith("5"):
+            self.server_errors[route] += 1
+
+        entry = (process_time_ms, self.requests, {
+            "timestamp": record.get("timestamp"),
+            "method": record.get("method"),
+            "url": record.get("url"),
+            "status_code": status_code,
+            "process_time_ms": process_time_ms,
+        })
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, entry)
+        elif self.top:
+            heapq.heappushpop(self._slowest, entry)
+
+    def add_file(self, path: str):
+        self.files.append(path)
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.strip():
+                    self.add_line(line)
+
+    def to_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "lines": self.lines,
+            "malformed_lines": self.malformed,
+            "requests": self.requests,
+            "from": self.first_timestamp.isoformat(sep=" ") if self.first_timestamp else None,
+            "to": self.last_timestamp.isoformat(sep=" ") if self.last_timestamp else None,
+            "window_minutes": self.window_seconds // 60,
+            "routes": {route: stats.summary() for route, stats in sorted(self.routes.items())},
+            "windows": [
+                {
+                    "start": start.isoformat(sep=" "),
+                    "routes": {route: stats.summary() for route, stats in sorted(routes.items())},
+                }
+                for start, routes in sorted(self.windows.items())
+            ],
+            "slowest_requests": [entry for _, _, entry in sorted(self._slowest, reverse=True)],
+            "server_errors_by_route": dict(self.server_errors.most_common(self.top)),
+            "top_error_sources": dict(self.error_sources.most_common(self.top)),
+            "error_sources_dropped": self.error_sources_dropped,
+        }
+
+def rotated_log_files(log_path: str = LOG_FILE_PATH) -> list[str]:
+    """
+    `log_path` and its rotations (app.log.1, app.log.2.gz, ...), oldest first.
+    """
+    def rotation_number(path: str) -> int:
+        suffix = path[len(log_path) + 1:].removesuffix(".gz")
+        return int(suffix) if suffix.isdigit() else -1
+
+    candidates = [p for p in glob.glob(glob.escape(log_path) + ".*") if rotation_number(p) >= 0]
+    candidates.sort(key=rotation_number, reverse=True)
+    for current in (log_path, log_path + ".gz"):
+        if os.path.exists(current):
+            candidates.append(current)
+    return candidates
+
+def iter_files(paths: list[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+        else:
+            print(f"Skipping missing log file {path}", file=sys.stderr)
+
+def _table(headers: list[str], rows: list[list]) -> list[str]:
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    line = lambda cells: "  ".join(str(c).rjust(w) if i else str(c).ljust(w) for i, (c, w) in enumerate(zip(cells, widths)))
+    return [line(headers), line(["-" * w for w in widths]), *(line(row) for row in rows)]
+
+def _route_rows(routes: dict) -> list[list]:
+    return [
+        [route, s["count"], s["p50_ms"], s["p95_ms"], s["p99_ms"], s["max_ms"],
+         " ".join(f"{code}:{n}" for code, n in s["statuses"].items())]
+        for route, s in routes.items()
+    ]
+
+def format_text(report: dict) -> str:
+    headers = ["route", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms", "statuses"]
+    out = [
+        f"Files: {', '.join(report['files']) or '(none)'}",
+        f"Lines: {report['lines']} ({report['malformed_lines']} malformed), requests: {report['requests']}",
+        f"Period: {report['from']} .. {report['to']}",
+        "",
+        "Per route",
+        *_table(headers, _route_rows(report["routes"])),
+    ]
+    for window in report["windows"]:
+        out += ["", f"Window {window['start']} ({report['window_minutes']} min)"]
+        out += _table(headers, _route_rows(window["routes"]))
+    out += ["", "Slowest requests"]
+    out += _table(
+        ["timestamp", "ms", "status", "method", "url"],
+        [[r["timestamp"], r["process_time_ms"], r["status_code"], r["method"], r["url"]]
+         for r in report["slowest_requests"]],
+    )
+    out += ["", "5xx responses by route"]
+    out += [f"  {n:>6}  {route}" for route, n in report["server_errors_by_route"].items()] or ["  none"]
+    out += ["", "Top error sources"]
+    out += [f"  {n:>6}  {source}" for source, n in report["top_error_sources"].items()] or ["  none"]
+    if report["error_sources_dropped"]:
+        out.append(f"  ({report['error_sources_dropped']} rare sources dropped; counts are lower bounds)")
+    return "\n".join(out)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="log files, plain or .gz (default: app.log and its rotations)")
+    parser.add_argument("--window", type=int, default=60, help="time window in minutes")
+    parser.add_argument("--top", type=int, default=10, help="slowest requests / error sources to list")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.window < 1:
+        print("--window must be at least 1 minute", file=sys.stderr)
+        return 2
+    report = LogReport(window_minutes=args.window, top=args.top)
+    for path in iter_files(args.paths or rotated_log_files()):
+        report.add_file(path)
+    result = report.to_dict()
+    print(json.dumps(result, indent=2) if args.format == "json" else format_text(result))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
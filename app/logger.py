@@ -1,10 +1,15 @@
 # app/logger.py
+import atexit
 import logging
 import logging.handlers
+import queue
+import random
 import json
 from pythonjsonlogger import jsonlogger
 import os
 
+from app.core.config import LOG_LEVEL, LOG_QUEUE_ENABLED, LOG_QUEUE_MAX_SIZE, LOG_SAMPLE_RATE
+
 # Path for logs folder outside the app directory, relative to app/logger.py location
 LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logs'))
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -19,30 +24,132 @@ class JsonFormatter(jsonlogger.JsonFormatter):
         if not log_record.get('timestamp'):
             log_record['timestamp'] = self.formatTime(record, self.datefmt)
 
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a `rate` fraction of DEBUG/INFO records; WARNING and above always pass.
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or self.rate >= 1.0 or random.random() < self.rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller: records go onto a bounded queue and are
+    counted and dropped when it is full. Formatting is left to the listener thread.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves this process, so the record can be handed over as-is
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _build_handlers() -> list[logging.Handler]:
+    # File handler with rotation: 5 files max, 1MB each
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE_PATH, maxBytes=1_000_000, backupCount=5, encoding='utf-8', delay=True
+    )
+    # JSON formatter for structured logs
+    file_handler.setFormatter(JsonFormatter('%(timestamp)s %(level)s %(name)s %(message)s'))
+
+    # Optional: also log to console (stdout)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+    return [file_handler, console_handler]
+
+_sampling_filter = SamplingFilter(LOG_SAMPLE_RATE)
+_queue_handler: DroppingQueueHandler | None = None
+_listener: logging.handlers.QueueListener | None = None
+_listener_running = False
+_direct_handlers: list[logging.Handler] | None = None
+_configured: list[logging.Logger] = []  # loggers get_logger attached the shared handlers to
+
+def _swap_handlers(old: list[logging.Handler], new: list[logging.Handler]):
+    for logger in _configured:
+        for handler in old:
+            logger.removeHandler(handler)
+        for handler in new:
+            logger.addHandler(handler)
+
+def _start_listener():
+    global _listener_running
+    _listener.start()
+    _listener_running = True
+    # Undo stop_logging: records go back through the queue (sampled there)
+    for handler in _listener.handlers:
+        handler.removeFilter(_sampling_filter)
+    _swap_handlers(list(_listener.handlers), [_queue_handler])
+
+def _shared_handlers() -> list[logging.Handler]:
+    """
+    Handlers shared by every logger from get_logger: either a single queue handler
+    feeding a background listener, or the file/console handlers used directly.
+    """
+    global _queue_handler, _listener, _direct_handlers
+    if LOG_QUEUE_ENABLED:
+        if _queue_handler is None:
+            _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_MAX_SIZE))
+            _queue_handler.addFilter(_sampling_filter)
+            _listener = logging.handlers.QueueListener(
+                _queue_handler.queue, *_build_handlers(), respect_handler_level=True
+            )
+            atexit.register(stop_logging)
+        if not _listener_running:
+            _start_listener()  # first use, or logging again after stop_logging
+        return [_queue_handler]
+    if _direct_handlers is None:
+        _direct_handlers = _build_handlers()
+        for handler in _direct_handlers:
+            handler.addFilter(_sampling_filter)
+    return _direct_handlers
+
 def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)  # Log all levels DEBUG and above
+    logger.setLevel(LOG_LEVEL)  # Per-environment level, see app.core.config
 
+    handlers = _shared_handlers()
     if not logger.hasHandlers():
-        # File handler with rotation: 5 files max, 1MB each
-        file_handler = logging.handlers.RotatingFileHandler(
-            LOG_FILE_PATH, maxBytes=1_000_000, backupCount=5, encoding='utf-8'
-        )
-        file_handler.setLevel(logging.DEBUG)
+        for handler in handlers:
+            logger.addHandler(handler)
+        _configured.append(logger)
 
-        # JSON formatter for structured logs
-        formatter = JsonFormatter('%(timestamp)s %(level)s %(name)s %(message)s')
-        file_handler.setFormatter(formatter)
-
-        logger.addHandler(file_handler)
+    return logger
 
-        # Optional: also log to console (stdout)
-        console_handler = logging.StreamHandler()
-        console_formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s')
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+def stop_logging():
+    """
+    Flush queued records and stop the background listener (safe to call twice).
+    Later records are written directly by the file/console handlers until the next
+    get_logger call starts the listener again.
+    """
+    global _listener_running
+    if _listener_running:
+        _listener.stop()
+        _listener_running = False
+        for handler in _listener.handlers:
+            handler.addFilter(_sampling_filter)
+        _swap_handlers([_queue_handler], list(_listener.handlers))
 
-    return logger
+def log_stats() -> dict:
+    return {
+        "queue_enabled": LOG_QUEUE_ENABLED,
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+        "sampled_out": _sampling_filter.sampled_out,
+    }
 
 # Usage example (remove/comment out before production or tests)
 # logger = get_logger(__name__)
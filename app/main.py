@@ -1,18 +1,33 @@
 # app/main.py
 
+from app.core.startup import startup_timer  # first, so import time is measured
 from dotenv import load_dotenv
+import asyncio
 import os
 
 load_dotenv()  # Load variables from .env into os.environ
 
 from fastapi import FastAPI, Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.database import engine, Base
+from app.database import get_pool_stats, dispose_engines
+from app.migrations import check_schema, upgrade
+from app.core.config import DB_SCHEMA_CHECK_STRICT, DB_AUTO_MIGRATE, SERVER_SHUTDOWN_DELAY_SECONDS
 import app.models.user_orm  # ensure ORM model is registered
 from app.routers.user import router as user_router
 from app.routers import auth
-from app.logger import get_logger
-import time
+from app.routers.metrics import router as metrics_router
+from app.routers.health import router as health_router
+from app.logger import get_logger, stop_logging, log_stats
+from app.core.password_hashing import hashing_pool
+from app.core.cache import token_claims_cache, user_cache
+from app.core.metrics import registry
+from app.core.rate_limit import login_rate_limiter
+from app.core.jwt_keys import key_set
+from app.services.user_service import user_lookups
+from app.core.config import FAST_JSON_RESPONSES
+from app.core.fast_json import FastJSONResponse
+from app.middleware.instrumentation import RequestInstrumentationMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.core.config import PROFILING_ENABLED
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -28,7 +43,8 @@ app = FastAPI(
     openapi_tags=[
         {"name": "auth", "description": "Authentication endpoints"},
         {"name": "users", "description": "User management operations"}
-    ]
+    ],
+    default_response_class=FastJSONResponse if FAST_JSON_RESPONSES else JSONResponse
 )
 
 
@@ -47,43 +63,69 @@ app.add_middleware(
 
 app.include_router(auth.router)  # mount /login and auth routes
 app.include_router(user_router)  # mount user routes
+app.include_router(metrics_router)  # mount /metrics
+app.include_router(health_router)  # mount /health and /ready
 
 @app.on_event("startup")
 async def on_startup():
     """
-    On app startup, create all tables in the DB
-    (no-op if they already exist).
+    On app startup, check the DB schema version with a single query
+    (schema changes are applied by `python -m app.migrations upgrade`).
     Log startup event.
     """
-    logger.info("Application startup: Creating database tables if not exist")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if DB_AUTO_MIGRATE:
+        logger.info("Application startup: migrating database schema")
+        await upgrade()
+    elif not await check_schema() and DB_SCHEMA_CHECK_STRICT:
+        raise RuntimeError("Database schema is out of date")
+    # Create or rotate signing keys (under the key directory lock) before the first login,
+    # then keep re-reading them in the background, off the request path
+    await asyncio.to_thread(key_set.ensure_keys)
+    key_set.start_refresh()
+    startup_timer.mark_started()
+    # /ready fails from the shutdown signal on, not only once the socket is already closed
+    startup_timer.stop_on_signals(SERVER_SHUTDOWN_DELAY_SECONDS)
+    logger.info("Application startup complete", extra=startup_timer.stats())
 
 @app.on_event("shutdown")
 async def on_shutdown():
     """
-    Log shutdown event.
+    Log shutdown event, stop the password hashing workers and flush queued logs.
     """
-    logger.info("Application shutdown")
-
-# Middleware for structured logging of requests and responses
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-
-        log_data = {
-            "method": request.method,
-            "url": str(request.url),
-            "status_code": response.status_code,
-            "process_time_ms": round(process_time * 1000, 2),
-            "client_host": request.client.host if request.client else None
-        }
-        logger.info("HTTP request completed", extra=log_data)
-        return response
-
-app.add_middleware(LoggingMiddleware)
+    logger.info("Application shutdown", extra={"password_hashing": hashing_pool.stats()})
+    await key_set.stop_refresh()
+    hashing_pool.shutdown()
+    await dispose_engines()
+    stop_logging()
+
+# Opt-in per-request cProfile; not installed at all unless enabled
+if PROFILING_ENABLED:
+    from app.middleware.profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware)
+
+# Keep a client's reads on the primary right after its own writes (replica lag)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Pure ASGI middleware for request metrics and structured request logging
+app.add_middleware(RequestInstrumentationMiddleware)
+
+# Export stats owned by other modules on /metrics
+registry.register_collector(lambda: {
+    f"password_hash_{key}": value for key, value in hashing_pool.stats().items() if key != "executor"
+})
+registry.register_collector(lambda: {
+    **{f"auth_token_cache_{key}": value for key, value in token_claims_cache.stats().items()},
+    **{f"auth_user_cache_{key}": value for key, value in user_cache.stats().items()},
+})
+registry.register_collector(lambda: {
+    f"db_pool_{key}": value for key, value in get_pool_stats().items() if key != "pool"
+})
+registry.register_collector(lambda: {f"startup_{key}": value for key, value in startup_timer.stats().items()})
+registry.register_collector(lambda: {f"user_lookup_{key}": value for key, value in user_lookups.stats().items()})
+registry.register_collector(lambda: {"login_rate_limited_total": login_rate_limiter.rejected})
+registry.register_collector(lambda: {
+    f"log_{key}": value for key, value in log_stats().items() if key != "queue_enabled"
+})
 
 # Exception handlers
 
@@ -109,7 +151,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     })
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(RequestValidationError)
@@ -123,3 +166,5 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         status_code=422,
         content={"detail": exc.errors()}
     )
+
+startup_timer.mark_imported()
@@ -0,0 +1,84 @@
+# app/middleware/instrumentation.py
+import time
+
+from app.core.config import SERVER_TIMING_ENABLED
+from app.core.metrics import registry
+from app.core import sql_stats
+from app.core.startup import startup_timer
+from app.logger import get_logger
+
+logger = get_logger("pep2-backend")
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+RESPONSES = registry.counter(
+    "http_responses_total", "HTTP responses by route template and status code", ("method", "route", "status")
+)
+IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests currently being served")
+
+# Label for requests that matched no route, so unknown URLs can't blow up label cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+class RequestInstrumentationMiddleware:
+    """
+    Pure ASGI middleware: times each HTTP request with a monotonic clock, records
+    per-route-template latency/status metrics and logs one structured line per request,
+    including the number of SQL statements it ran and their total time.
+    Unlike BaseHTTPMiddleware it does not wrap the response, so streaming keeps working.
+    """
+    def __init__(self, app, server_timing: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500  # reported if the app raises before sending a response
+        IN_FLIGHT.inc()
+        sql_token = sql_stats.begin_request()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    duration_ms = (time.perf_counter() - start) * 1000
+                    db = sql_stats.current_stats()
+                    headers = list(message.get("headers", []))
+                    headers.append((
+                        b"server-timing",
+                        f"app;dur={duration_ms:.2f}, db;dur={db.time_ms:.2f};desc=\"{db.queries} queries\"".encode(),
+                    ))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            process_time = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            db = sql_stats.end_request(sql_token, f"{method} {route_path}")
+            REQUEST_DURATION.observe(process_time, method, route_path)
+            RESPONSES.inc(method, route_path, str(status_code))
+            if startup_timer.mark_first_request():
+                logger.info("First request served", extra=startup_timer.stats())
+
+            client = scope.get("client")
+            query = scope.get("query_string", b"")
+            logger.info("HTTP request completed", extra={
+                "method": method,
+                "url": scope["path"] + ("?" + query.decode("latin-1") if query else ""),
+                "route": route_path,
+                "status_code": status_code,
+                "process_time_ms": round(process_time * 1000, 2),
+                "db_queries": db.queries,
+                "db_time_ms": db.time_ms,
+                "client_host": client[0] if client else None
+            })
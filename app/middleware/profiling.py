@@ -0,0 +1,136 @@
+# app/middleware/profiling.py
+"""
+On-demand cProfile of single requests. A request is profiled when it carries
+`X-Profile: <PROFILING_TOKEN>`, or at random with probability PROFILING_SAMPLE_RATE.
+The profile is written as a pstats file under logs/profiles (open it with
+`python -m pstats`, snakeviz, or turn it into a flamegraph with flameprof), and its
+file name is returned in the X-Profile-Id response header.
+
+Only registered when PROFILING_ENABLED is set; other requests pay one header lookup.
+cProfile sees everything the event loop runs while the request is in flight, so
+concurrent requests can show up in the profile too. One request is profiled at a time.
+"""
+import asyncio
+import cProfile
+import hmac
+import os
+import random
+import re
+import time
+from datetime import datetime
+
+from app.core.config import (
+    PROFILING_TOKEN, PROFILING_SAMPLE_RATE, PROFILING_DIR, PROFILING_MAX_FILES, PROFILING_MAX_BYTES,
+    PROFILING_RETENTION_HOURS,
+)
+from app.core.metrics import registry
+from app.logger import LOG_DIR, get_logger
+
+logger = get_logger("pep2-backend")
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+PROFILED = registry.counter("http_requests_profiled_total", "Requests profiled by the profiling middleware")
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9]+")
+
+def prune_profiles(directory: str, max_files: int, max_bytes: int, retention_seconds: float) -> int:
+    """
+    Delete expired profiles, then the oldest ones until the count and size caps hold.
+    Returns the number of files removed.
+    """
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(".prof"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()  # oldest first
+    cutoff = time.time() - retention_seconds
+    total_bytes = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, path in entries:
+        if mtime >= cutoff and len(entries) - removed <= max_files and total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        removed += 1
+        total_bytes -= size
+    return removed
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that runs selected requests under cProfile (see module docstring).
+    """
+    def __init__(
+        self,
+        app,
+        token: str = PROFILING_TOKEN,
+        sample_rate: float = PROFILING_SAMPLE_RATE,
+        directory: str = PROFILING_DIR or os.path.join(LOG_DIR, "profiles"),
+        max_files: int = PROFILING_MAX_FILES,
+        max_bytes: int = PROFILING_MAX_BYTES,
+        retention_hours: float = PROFILING_RETENTION_HOURS,
+    ):
+        self.app = app
+        self.token = token.encode()
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_hours * 3600
+        self._busy = False  # cProfile can't run two profilers on one thread
+
+    def _requested(self, scope) -> bool:
+        if self.token:
+            for name, value in scope.get("headers", ()):
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _profile_id(self, scope) -> str:
+        route = _UNSAFE.sub("_", scope["path"]).strip("_")[:60] or "root"
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        return f"{stamp}_{scope['method']}_{route}"
+
+    def _save(self, profiler: cProfile.Profile, profile_id: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, profile_id + ".prof")
+        profiler.dump_stats(path)
+        prune_profiles(self.directory, self.max_files, self.max_bytes, self.retention_seconds)
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self._profile_id(scope)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self._busy = True
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._busy = False
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+            PROFILED.inc()
+            try:
+                path = await asyncio.to_thread(self._save, profiler, profile_id)
+                logger.info("Request profiled", extra={
+                    "method": scope["method"], "url": scope["path"], "process_time_ms": elapsed_ms, "profile": path,
+                })
+            except OSError as exc:
+                logger.warning(f"Could not write request profile {profile_id}: {exc}")
@@ -0,0 +1,58 @@
+# app/middleware/read_your_writes.py
+"""
+Per-client read-your-writes for replica routing. A request that writes to the primary
+gets a short-lived cookie holding the time until which that client's reads must use the
+primary; later requests carrying it skip the replicas (see app.database.get_read_session).
+Other clients keep reading from replicas.
+"""
+import math
+import time
+from http.cookies import CookieError, SimpleCookie
+
+from app.core.config import READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_SECONDS
+from app.database import begin_writer_scope, current_writer, end_writer_scope
+
+def _primary_until(scope, cookie_name: str, window_seconds: float) -> float:
+    for name, value in scope.get("headers", ()):
+        if name == b"cookie":
+            cookie = SimpleCookie()
+            try:
+                cookie.load(value.decode("latin-1"))
+                until = float(cookie[cookie_name].value)
+            except (CookieError, KeyError, ValueError):
+                continue
+            # Never trust a client for longer than one window
+            return min(until, time.time() + window_seconds)
+    return 0.0
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware that scopes read-your-writes to the writing client via a cookie.
+    """
+    def __init__(self, app, cookie_name: str = READ_YOUR_WRITES_COOKIE, window_seconds: float = READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.cookie_name = cookie_name
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.window_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        token = begin_writer_scope(_primary_until(scope, self.cookie_name, self.window_seconds))
+        writer = current_writer()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and writer.wrote:
+                max_age = math.ceil(writer.primary_until - time.time())
+                cookie = (
+                    f"{self.cookie_name}={writer.primary_until:.3f}; Max-Age={max(max_age, 1)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_writer_scope(token)
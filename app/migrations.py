@@ -0,0 +1,123 @@
+# app/migrations.py
+"""
+Explicit schema management, run once per deploy instead of on every worker start:
+
+    python -m app.migrations upgrade   # create or migrate the schema to SCHEMA_VERSION
+    python -m app.migrations check     # exit 1 if the database is not at SCHEMA_VERSION
+
+The app itself only runs `check_schema` on startup: a single SELECT on schema_version.
+"""
+import asyncio
+import sys
+from typing import Callable
+
+from sqlalchemy import Column, Integer, MetaData, Table, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.database import Base, get_engine
+from app.models.user_orm import install_user_search, install_name_prefix_index  # also registers the ORM model
+from app.logger import get_logger
+
+logger = get_logger("pep2-backend")
+
+# Bump together with a new entry in MIGRATIONS whenever the ORM schema changes
+SCHEMA_VERSION = 4
+
+def _add_user_versioning(sync_conn):
+    # users.version / users.updated_at, for ETag and Last-Modified
+    sync_conn.execute(text("ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+    if sync_conn.dialect.name == "sqlite":
+        # SQLite can't add a column with a non-constant default; backfill instead
+        sync_conn.execute(text("ALTER TABLE users ADD COLUMN updated_at DATETIME"))
+        sync_conn.execute(text("UPDATE users SET updated_at = CURRENT_TIMESTAMP"))
+    else:
+        sync_conn.execute(text("ALTER TABLE users ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()"))
+
+# version -> step upgrading a database from version - 1 (sync connection, runs in run_sync)
+MIGRATIONS: dict[int, Callable] = {
+    2: _add_user_versioning,
+    3: install_user_search,  # trigram / FTS5 indexes for GET /users/search
+    4: install_name_prefix_index,  # lower(name) index for GET /users/?name=
+}
+
+_version_metadata = MetaData()
+schema_version_table = Table(
+    "schema_version",
+    _version_metadata,
+    Column("version", Integer, nullable=False),
+)
+
+async def get_schema_version(conn: AsyncConnection) -> int | None:
+    """
+    Current schema version, or None if the database was never initialised by this module.
+    """
+    try:
+        result = await conn.execute(select(schema_version_table.c.version))
+    except DBAPIError:
+        return None
+    return result.scalar()
+
+def _stamp(sync_conn, version: int):
+    sync_conn.execute(schema_version_table.delete())
+    sync_conn.execute(schema_version_table.insert().values(version=version))
+
+def _upgrade(sync_conn, current: int | None) -> int:
+    existing_tables = set(inspect(sync_conn).get_table_names())
+    if current is None and "users" not in existing_tables:
+        # Fresh database: create everything at the latest version directly
+        Base.metadata.create_all(sync_conn)
+        _version_metadata.create_all(sync_conn)
+        _stamp(sync_conn, SCHEMA_VERSION)
+        return SCHEMA_VERSION
+    # Databases created by the old create_all-on-startup are version 1
+    current = current or 1
+    _version_metadata.create_all(sync_conn)
+    for version in range(current + 1, SCHEMA_VERSION + 1):
+        logger.info(f"Migrating database schema to version {version}")
+        MIGRATIONS[version](sync_conn)
+    _stamp(sync_conn, SCHEMA_VERSION)
+    return SCHEMA_VERSION
+
+async def upgrade(engine: AsyncEngine | None = None) -> int:
+    """
+    Create or migrate the schema to SCHEMA_VERSION. Returns the resulting version.
+    """
+    engine = engine or get_engine()
+    async with engine.connect() as conn:
+        current = await get_schema_version(conn)
+    async with engine.begin() as conn:
+        version = await conn.run_sync(_upgrade, current)
+    logger.info(f"Database schema at version {version}")
+    return version
+
+async def check_schema(engine: AsyncEngine | None = None) -> bool:
+    """
+    One round trip: True if the database schema is at SCHEMA_VERSION.
+    """
+    engine = engine or get_engine()
+    async with engine.connect() as conn:
+        current = await get_schema_version(conn)
+    if current != SCHEMA_VERSION:
+        logger.error(
+            f"Database schema version is {current}, expected {SCHEMA_VERSION}; "
+            "run `python -m app.migrations upgrade`"
+        )
+        return False
+    return True
+
+async def _main(command: str) -> int:
+    try:
+        if command == "upgrade":
+            await upgrade()
+            print(f"✅ Database schema at version {SCHEMA_VERSION}")
+            return 0
+        if command == "check":
+            return 0 if await check_schema() else 1
+    finally:
+        await get_engine().dispose()
+    print(f"Unknown command {command!r}; use 'upgrade' or 'check'", file=sys.stderr)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "upgrade")))
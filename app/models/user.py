@@ -1,7 +1,11 @@
 # app/models/user.py
 
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from datetime import datetime
+
+from pydantic import BaseModel, EmailStr, Field
+from typing import Any, Dict, List, Literal, Optional
+
+from app.core.config import USERS_BULK_MAX_SIZE, USERS_LOOKUP_MAX_IDS
 
 class UserBase(BaseModel):
     name: str
@@ -12,10 +16,44 @@ class UserCreate(UserBase):
 
 class User(UserBase):
     id: Optional[int]
+    # Validators for ETag / Last-Modified; kept on the snapshot but never serialized
+    version: Optional[int] = Field(default=None, exclude=True)
+    updated_at: Optional[datetime] = Field(default=None, exclude=True)
 
     class Config:
         from_attributes = True
 
+class UserPage(BaseModel):
+    items: List[User]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to fetch the next page
+
+class UserBulkCreate(BaseModel):
+    # Rows are validated one by one so a single bad row doesn't reject the whole batch
+    users: List[Dict[str, Any]] = Field(..., min_length=1, max_length=USERS_BULK_MAX_SIZE)
+
+class UserBulkItemResult(BaseModel):
+    index: int  # position of the row in the request
+    status: Literal["created", "duplicate", "invalid"]
+    user: Optional[User] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+class UserBulkResult(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: List[UserBulkItemResult]
+
+class UserLookupRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=USERS_LOOKUP_MAX_IDS)
+
+class UserLookupItem(BaseModel):
+    id: int
+    found: bool
+    user: Optional[User] = None
+
+class UserLookupResult(BaseModel):
+    results: List[UserLookupItem]  # same order as the requested ids
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -1,8 +1,13 @@
 # app/models/user_orm.py
 
-from sqlalchemy import Column, Integer, String
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, String, event, func, inspect
 from app.database import Base
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
 class UserORM(Base):
     """
     SQLAlchemy ORM model mapping the 'users' table in Postgres.
@@ -11,6 +16,10 @@ class UserORM(Base):
       - name: non-null text
       - email: unique, indexed text
       - hashed_password: securely stored (bcrypt hash), required for auth
+      - version: bumped on changes to serialized fields (name, email), used for ETags;
+        ORM flushes bump it in `_bump_version`, Core UPDATEs of those columns must set
+        `version=UserORM.version + 1` themselves
+      - updated_at: time of the last change to serialized fields, used for Last-Modified
     """
     __tablename__ = "users"
 
@@ -18,3 +27,80 @@ class UserORM(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow, server_default=func.now()
+    )
+
+# Columns that end up in the User response; changing any of them changes the ETag
+SERIALIZED_COLUMNS = ("name", "email")
+
+@event.listens_for(UserORM, "before_update")
+def _bump_version(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[key].history.has_changes() for key in SERIALIZED_COLUMNS):
+        target.version = target.version + 1
+
+# ─── Search indexes ────────────────────────────────────────────────────────────
+# Substring search on name/email (GET /users/search) needs indexes the ORM can't
+# declare portably: pg_trgm GIN indexes on Postgres, an FTS5 trigram table kept in
+# sync by triggers on SQLite. They are created with the users table and by migration 3.
+
+USERS_SEARCH_TABLE = "users_search"
+
+_SQLITE_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {USERS_SEARCH_TABLE} USING fts5("
+    "name, email, content='users', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN "
+    f"INSERT INTO {USERS_SEARCH_TABLE}(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN "
+    f"INSERT INTO {USERS_SEARCH_TABLE}({USERS_SEARCH_TABLE}, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS users_search_au AFTER UPDATE OF name, email ON users BEGIN "
+    f"INSERT INTO {USERS_SEARCH_TABLE}({USERS_SEARCH_TABLE}, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); "
+    f"INSERT INTO {USERS_SEARCH_TABLE}(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+    # Index rows that existed before the table (no-op on a fresh table)
+    f"INSERT INTO {USERS_SEARCH_TABLE}({USERS_SEARCH_TABLE}) VALUES ('rebuild')",
+)
+
+_POSTGRES_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm ON users USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (email gin_trgm_ops)",
+)
+
+def install_user_search(sync_conn):
+    """
+    Create the search indexes for the connection's dialect (idempotent).
+    """
+    statements = {"sqlite": _SQLITE_SEARCH_DDL, "postgresql": _POSTGRES_SEARCH_DDL}
+    for statement in statements.get(sync_conn.dialect.name, ()):
+        sync_conn.exec_driver_sql(statement)
+
+# ─── Name prefix index ─────────────────────────────────────────────────────────
+# GET /users/?name= filters on lower(name) LIKE 'prefix%'. text_pattern_ops lets Postgres
+# serve that with a btree range scan whatever the collation. SQLite can't use an index
+# for LIKE on an expression, so there the filter is checked while walking the id order.
+# Created with the users table and by migration 4.
+
+_POSTGRES_NAME_PREFIX_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_users_name_lower ON users (lower(name) text_pattern_ops)",
+)
+
+def install_name_prefix_index(sync_conn):
+    """
+    Create the name prefix index where the dialect can use it (idempotent).
+    """
+    if sync_conn.dialect.name == "postgresql":
+        for statement in _POSTGRES_NAME_PREFIX_DDL:
+            sync_conn.exec_driver_sql(statement)
+
+def drop_user_search(sync_conn):
+    if sync_conn.dialect.name == "sqlite":
+        # The triggers go with the users table; the FTS table would outlive it
+        sync_conn.exec_driver_sql(f"DROP TABLE IF EXISTS {USERS_SEARCH_TABLE}")
+
+event.listen(UserORM.__table__, "after_create", lambda target, conn, **kw: install_user_search(conn))
+event.listen(UserORM.__table__, "after_create", lambda target, conn, **kw: install_name_prefix_index(conn))
+event.listen(UserORM.__table__, "before_drop", lambda target, conn, **kw: drop_user_search(conn))
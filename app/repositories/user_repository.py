@@ -1,28 +1,226 @@
 # app/repositories/user_repository.py
+from typing import AsyncIterator
+
+from sqlalchemy import column, func, insert, or_, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.models.user_orm import UserORM
+from app.core.config import USERS_SEARCH_MIN_LENGTH
+from app.models.user_orm import UserORM, USERS_SEARCH_TABLE
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+# Bound on bind parameters per IN (...) list, well under Postgres/SQLite limits
+_IN_CHUNK_SIZE = 5000
 
 class UserRepository:
+    """
+    Write methods commit the session. Reads leave the caller's transaction alone unless
+    asked to release the connection (`release_connection=True`), which commits the
+    session, including anything the caller still had pending.
+    """
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def add(self, user_orm: UserORM) -> UserORM:
-        self.session.add(user_orm)
+    async def _read(self, statement, release_connection: bool = False):
+        """
+        Execute a read. With `release_connection` the transaction ends straight away and
+        the pooled connection goes back, instead of staying checked out until the
+        request's session closes; for callers doing slow work after the read (a bcrypt
+        check after the login lookup, hashing a bulk import). The result is buffered and
+        expire_on_commit=False keeps the rows loaded.
+        """
+        result = await self.session.execute(statement)
+        if release_connection:
+            await self.session.commit()
+        return result
+
+    def _insert_skipping_duplicate_emails(self):
+        """
+        INSERT that silently skips rows whose email already exists (ON CONFLICT DO NOTHING),
+        on the dialects that support it. Other dialects get a plain INSERT.
+        """
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(UserORM).on_conflict_do_nothing(index_elements=[UserORM.email])
+        if dialect == "sqlite":
+            return sqlite.insert(UserORM).on_conflict_do_nothing(index_elements=[UserORM.email])
+        return insert(UserORM)
+
+    async def create(self, name: str, email: str, hashed_password: str) -> UserORM | None:
+        """
+        Insert one user with a single INSERT ... RETURNING and commit.
+        Returns None when the email is already taken (the unique index decides,
+        so concurrent signups with the same email can't both succeed).
+        """
+        stmt = self._insert_skipping_duplicate_emails().values(
+            name=name, email=email, hashed_password=hashed_password
+        ).returning(UserORM)
+        try:
+            user_orm = (await self.session.scalars(stmt)).first()
+        except IntegrityError:
+            # Dialects without ON CONFLICT support report the duplicate as an error
+            await self.session.rollback()
+            return None
         await self.session.commit()
-        await self.session.refresh(user_orm)
         return user_orm
 
+    async def add_many(self, rows: list[dict]) -> list[UserORM]:
+        """
+        Insert many users with batched multi-row INSERT ... RETURNING statements in a
+        single transaction. Rows that collide with an existing email are skipped and
+        simply missing from the result.
+        """
+        if not rows:
+            return []
+        stmt = self._insert_skipping_duplicate_emails().returning(UserORM)
+        result = await self.session.scalars(stmt, rows)
+        created = result.all()
+        await self.session.commit()
+        return created
+
+    async def update_password_hash(self, user_id: int, hashed_password: str):
+        # The hash is never serialized: leave version and updated_at (the ETag and
+        # Last-Modified validators) alone so a rehash doesn't invalidate client caches
+        await self.session.execute(
+            update(UserORM)
+            .where(UserORM.id == user_id)
+            .values(hashed_password=hashed_password, updated_at=UserORM.updated_at)
+        )
+        await self.session.commit()
+
+    async def get_existing_emails(self, emails: list[str], release_connection: bool = False) -> set[str]:
+        existing = set()
+        for start in range(0, len(emails), _IN_CHUNK_SIZE):
+            chunk = emails[start:start + _IN_CHUNK_SIZE]
+            result = await self._read(
+                select(UserORM.email).where(UserORM.email.in_(chunk)), release_connection=release_connection
+            )
+            existing.update(result.scalars().all())
+        return existing
+
     async def get_all(self) -> list[UserORM]:
-        result = await self.session.execute(select(UserORM))
+        result = await self._read(select(UserORM))
         return result.scalars().all()
 
+    def _page_query(self, query, limit: int, after_id: int | None, email: str | None, name: str | None):
+        query = query.order_by(UserORM.id).limit(limit)
+        if after_id is not None:
+            query = query.where(UserORM.id > after_id)
+        if email is not None:
+            query = query.where(UserORM.email == email)
+        if name is not None:
+            # lower(name) LIKE 'prefix%': a range scan on ix_users_name_lower on Postgres
+            # (text_pattern_ops); ILIKE couldn't use a btree index at all
+            prefix = func.lower(_escape_like(name)) + "%"
+            query = query.where(func.lower(UserORM.name).like(prefix, escape="\\"))
+        return query
+
+    async def get_page(
+        self,
+        limit: int,
+        after_id: int | None = None,
+        email: str | None = None,
+        name: str | None = None,
+    ) -> list[UserORM]:
+        """
+        Keyset page ordered by id: walks the primary key index from `after_id`
+        and stops after `limit` matching rows. Unfiltered, that is `limit` rows however
+        large the table is; with a filter the database may use the email or name index.
+        """
+        result = await self._read(self._page_query(select(UserORM), limit, after_id, email, name))
+        return result.scalars().all()
+
+    async def get_page_rows(
+        self,
+        limit: int,
+        after_id: int | None = None,
+        email: str | None = None,
+        name: str | None = None,
+    ) -> list[dict]:
+        """
+        Same page as `get_page`, but only the public columns plus `version` (for the
+        page ETag) as plain dicts (no ORM identity map or instrumentation), for the
+        fast JSON path.
+        """
+        columns = select(UserORM.id, UserORM.name, UserORM.email, UserORM.version)
+        result = await self._read(self._page_query(columns, limit, after_id, email, name))
+        return [dict(row) for row in result.mappings()]
+
+    async def get_page_versions(
+        self,
+        limit: int,
+        after_id: int | None = None,
+        email: str | None = None,
+        name: str | None = None,
+    ) -> list[tuple[int, int]]:
+        """
+        (id, version) for the rows of a page: enough to answer a conditional GET
+        without loading or serializing the rows themselves.
+        """
+        columns = select(UserORM.id, UserORM.version)
+        result = await self._read(self._page_query(columns, limit, after_id, email, name))
+        return [tuple(row) for row in result.all()]
+
     async def get_by_id(self, user_id: int) -> UserORM | None:
-        result = await self.session.execute(select(UserORM).where(UserORM.id == user_id))
+        result = await self._read(select(UserORM).where(UserORM.id == user_id))
         return result.scalars().first()
 
-    async def get_by_email(self, email: str) -> UserORM | None:
-        result = await self.session.execute(select(UserORM).where(UserORM.email == email))
+    async def stream_rows(self, batch_size: int) -> AsyncIterator[list[dict]]:
+        """
+        Every user's public columns in id order, `batch_size` rows at a time from a
+        server-side cursor (yield_per), so the table is never held in memory at once.
+        """
+        query = (
+            select(UserORM.id, UserORM.name, UserORM.email)
+            .order_by(UserORM.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(query)
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+        await self.session.commit()  # hand the connection back before the response finishes
+
+    def _search_filter(self, q: str):
+        """
+        Case-insensitive substring match on name or email, in a form the dialect's
+        search index can serve (see `install_user_search`).
+        """
+        # FTS5 trigram queries need at least one full trigram; shorter ones fall back to LIKE
+        if self.session.get_bind().dialect.name == "sqlite" and len(q) >= USERS_SEARCH_MIN_LENGTH:
+            # Quoted as one FTS5 string, so the query's own syntax characters are literal
+            match = '"' + q.replace('"', '""') + '"'
+            matching_ids = text(
+                f"SELECT rowid FROM {USERS_SEARCH_TABLE} WHERE {USERS_SEARCH_TABLE} MATCH :match"
+            ).bindparams(match=match).columns(column("rowid"))
+            return UserORM.id.in_(matching_ids)
+        # Postgres: ILIKE '%q%' is served by the pg_trgm GIN indexes
+        pattern = "%" + _escape_like(q) + "%"
+        return or_(UserORM.name.ilike(pattern, escape="\\"), UserORM.email.ilike(pattern, escape="\\"))
+
+    async def search(self, q: str, limit: int, after_id: int | None = None) -> list[UserORM]:
+        """
+        Keyset page (ordered by id) of users whose name or email contains `q`.
+        """
+        query = select(UserORM).where(self._search_filter(q)).order_by(UserORM.id).limit(limit)
+        if after_id is not None:
+            query = query.where(UserORM.id > after_id)
+        result = await self._read(query)
+        return result.scalars().all()
+
+    async def get_many_by_ids(self, user_ids: list[int]) -> list[UserORM]:
+        """
+        All users whose id is in `user_ids`, in one WHERE id IN (...) query (no particular order).
+        """
+        if not user_ids:
+            return []
+        result = await self._read(select(UserORM).where(UserORM.id.in_(user_ids)))
+        return result.scalars().all()
+
+    async def get_by_email(self, email: str, release_connection: bool = False) -> UserORM | None:
+        result = await self._read(select(UserORM).where(UserORM.email == email), release_connection=release_connection)
         return result.scalars().first()
 
     async def create_access_token(self, user: UserORM) -> str:
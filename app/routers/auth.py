@@ -1,12 +1,15 @@
 # app/routers/auth.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import UserLogin
 from app.models.token import Token
 from app.services.auth_service import AuthService
 from app.repositories.user_repository import UserRepository
 from app.database import get_session
+from app.core.rate_limit import login_rate_limiter
+from app.core.jwt_keys import key_set
+from app.core.config import JWKS_MAX_AGE_SECONDS
 
 router = APIRouter(tags=["auth"])
 
@@ -15,7 +18,11 @@ async def get_auth_service(session: AsyncSession = Depends(get_session)) -> Auth
     user_repo = UserRepository(session)
     return AuthService(user_repo)
 
-@router.post("/login", response_model=Token)
+# Runs before the auth service is built, so throttled attempts never reach bcrypt or the DB
+async def enforce_login_rate_limit(credentials: UserLogin, request: Request):
+    await login_rate_limiter.check(credentials.email, request.client.host if request.client else None)
+
+@router.post("/login", response_model=Token, dependencies=[Depends(enforce_login_rate_limit)])
 async def login(
     credentials: UserLogin,
     auth_service: AuthService = Depends(get_auth_service)
@@ -29,3 +36,15 @@ async def login(
         )
     access_token = auth_service.create_access_token(data={"sub": str(user.id)})
     return Token(access_token=access_token, token_type="bearer")
+
+@router.get("/.well-known/jwks.json")
+async def jwks():
+    """
+    Public token verification keys (JWKS), so other services can verify our tokens locally.
+    Includes keys scheduled to start signing soon; safe to cache for the max-age given.
+    """
+    return Response(
+        content=key_set.jwks(),
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={JWKS_MAX_AGE_SECONDS}"},
+    )
@@ -0,0 +1,30 @@
+# app/routers/health.py
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.core.startup import startup_timer
+
+router = APIRouter(tags=["health"])
+
+# Probes are answered from process state only: no session, no pool checkout, no query,
+# so a saturated pool or a slow database can't make the orchestrator kill healthy workers.
+
+@router.get("/health", include_in_schema=False)
+async def health():
+    """
+    Liveness: the worker's event loop is answering.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready", include_in_schema=False)
+async def ready():
+    """
+    Readiness: startup (schema check, signing keys) finished and shutdown hasn't begun.
+    """
+    if startup_timer.ready:
+        return {"status": "ready"}
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "stopping" if startup_timer.stopping else "starting"},
+    )
@@ -1,20 +1,28 @@
 # app/routers/user.py
 
 import logging
-from typing import List
+import time
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.user import User, UserCreate
-from app.models.user_orm import UserORM
+from app.models.user import (
+    User, UserCreate, UserPage, UserBulkCreate, UserBulkResult, UserLookupRequest, UserLookupResult,
+)
 from app.services.user_service import UserService
 from app.repositories.user_repository import UserRepository
-from app.database import get_session
-from app.exceptions.http_exceptions import DuplicateUserException, UserNotFoundException
-from app.core.config import SECRET_KEY, ALGORITHM
+from app.database import get_session, get_read_session
+from app.exceptions.http_exceptions import DuplicateUserException, UserNotFoundException, PasswordHashingBusyException
+from app.core.config import (
+    USERS_PAGE_DEFAULT_LIMIT, USERS_PAGE_MAX_LIMIT, USERS_SEARCH_MIN_LENGTH, USERS_EXPORT_BATCH_SIZE, FAST_JSON_RESPONSES,
+)
+from app.core.jwt_keys import key_set
+from app.core.etag import user_etag, page_etag, validator_headers, is_not_modified
+from app.core.pagination import next_page_headers
+from app.core.cache import token_claims_cache, user_cache
 
 # ─── Router Setup ────────────────────────────────────────────────────────────
 router = APIRouter(prefix="/users", tags=["users"])
@@ -29,33 +37,45 @@ def get_user_service(session: AsyncSession = Depends(get_session)):
     service = UserService(repo)
     return service
 
+# Read-only variant: may be served by a read replica
+def get_read_user_service(session: AsyncSession = Depends(get_read_session)):
+    return UserService(UserRepository(session))
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
-    session: AsyncSession = Depends(get_session)
-) -> UserORM:
+    session: AsyncSession = Depends(get_read_session)
+) -> User:
     token = credentials.credentials
-    logger.debug(f"Received token: {token}")
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.debug(f"Decoded JWT payload: {payload}")
-        sub = payload.get("sub")
-        if sub is None:
-            logger.error("JWT payload missing 'sub'")
+    user_id = token_claims_cache.get(token)
+    if user_id is None:
+        logger.debug(f"Received token: {token}")
+        try:
+            payload = key_set.decode(token)  # key picked by the token's kid
+            logger.debug(f"Decoded JWT payload: {payload}")
+            sub = payload.get("sub")
+            if sub is None:
+                logger.error("JWT payload missing 'sub'")
+                raise credentials_exception
+            user_id = int(sub)
+        except Exception as exc:
+            logger.error(f"JWT decode error: {exc}")
             raise credentials_exception
-        user_id = int(sub)
-    except Exception as exc:
-        logger.error(f"JWT decode error: {exc}")
-        raise credentials_exception
+        # Never keep a token cached past its own expiry
+        exp = payload.get("exp")
+        token_claims_cache.set(token, user_id, ttl_seconds=exp - time.time() if exp else None)
 
-    user_repo = UserRepository(session)
-    user = await user_repo.get_by_id(user_id)
-    if not user:
-        raise credentials_exception
+    user = user_cache.get(user_id)
+    if user is None:
+        # Coalesced with any concurrent lookup of the same id
+        user = await UserService(UserRepository(session)).find_user_by_id(user_id)
+        if user is None:
+            raise credentials_exception
+        user_cache.set(user_id, user)
     return user
 
 # ─── Endpoints ───────────────────────────────────────────────────────────────
@@ -72,30 +92,117 @@ async def create_user(user: UserCreate, service: UserService = Depends(get_user_
     except DuplicateUserException as dup_exc:
         logger.warning(f"Duplicate user creation attempt for email={user.email}")
         raise dup_exc
+    except PasswordHashingBusyException as busy_exc:
+        logger.warning(f"Password hashing pool saturated, rejecting signup for email={user.email}")
+        raise busy_exc
     except Exception as exc:
         logger.error(f"Unexpected error creating user with email={user.email}: {exc}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error") from exc
 
+@router.post("/bulk", response_model=UserBulkResult)
+async def bulk_create_users(
+    payload: UserBulkCreate,
+    service: UserService = Depends(get_user_service),
+    current_user: User = Depends(get_current_user)  # Require authentication
+):
+    logger.debug(f"Bulk create request with {len(payload.users)} rows")
+    result = await service.bulk_add_users(payload.users)
+    logger.info(f"Bulk create: created={result.created} duplicates={result.duplicates} invalid={result.invalid}")
+    return result
+
+@router.post("/lookup", response_model=UserLookupResult)
+async def lookup_users(
+    payload: UserLookupRequest,
+    service: UserService = Depends(get_read_user_service),
+    current_user: User = Depends(get_current_user)  # Require authentication
+):
+    logger.debug(f"Batch lookup of {len(payload.ids)} user ids")
+    result = await service.lookup_users(payload.ids)
+    logger.info(f"Batch lookup found {sum(item.found for item in result.results)} of {len(payload.ids)} ids")
+    return result
+
+# The body stays a bare array (as before pagination); the next page's cursor is in the
+# X-Next-Cursor and Link headers, absent on the last page
 @router.get("/", response_model=List[User])
 async def list_users(
-    service: UserService = Depends(get_user_service),
-    current_user: UserORM = Depends(get_current_user)  # Require authentication
+    request: Request,
+    response: Response,
+    limit: int = Query(USERS_PAGE_DEFAULT_LIMIT, ge=1, le=USERS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    email: Optional[str] = Query(None, description="Exact email match"),
+    name: Optional[str] = Query(None, description="Case-insensitive name prefix"),
+    service: UserService = Depends(get_read_user_service),
+    current_user: User = Depends(get_current_user)  # Require authentication
+):
+    logger.debug(f"Request to list users limit={limit} cursor={cursor}")
+    if "if-none-match" in request.headers:
+        # Check the page's ETag before loading or serializing any row. Pages carry no
+        # Last-Modified: max(updated_at) misses rows joining or leaving the page
+        etag = await service.list_users_page_etag(limit, cursor=cursor, email=email, name=name)
+        if is_not_modified(request, etag, None):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(etag, None))
+    if FAST_JSON_RESPONSES:
+        # Returning a Response bypasses response_model validation; the schema stays List[User]
+        body, next_cursor, etag = await service.list_users_page_json(limit, cursor=cursor, email=email, name=name)
+        headers = {**validator_headers(etag, None), **next_page_headers(request.url, next_cursor)}
+        return Response(content=body, media_type="application/json", headers=headers)
+    page = await service.list_users_page(limit, cursor=cursor, email=email, name=name)
+    etag = page_etag((u.id, u.version) for u in page.items)
+    response.headers.update(validator_headers(etag, None))
+    response.headers.update(next_page_headers(request.url, page.next_cursor))
+    logger.info(f"Returned {len(page.items)} users")
+    return page.items
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# /export and /search are declared before /{user_id} so they aren't parsed as ids
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    gzip: bool = Query(False, description="gzip the stream (Content-Encoding: gzip)"),
+    service: UserService = Depends(get_read_user_service),
+    current_user: User = Depends(get_current_user)  # Require authentication
 ):
-    logger.debug("Request to list all users")
-    users = await service.get_all_users()
-    logger.info(f"Returned {len(users)} users")
-    return users
+    logger.info(f"User {current_user.id} exporting users as {format}")
+    headers = {"Content-Disposition": f'attachment; filename="users.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    # The read session is a yield dependency, so it stays open until the body has been sent
+    return StreamingResponse(
+        service.export_users(format, USERS_EXPORT_BATCH_SIZE, compress=gzip),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+@router.get("/search", response_model=UserPage)
+async def search_users(
+    q: str = Query(..., min_length=USERS_SEARCH_MIN_LENGTH, description="Substring of the name or email"),
+    limit: int = Query(USERS_PAGE_DEFAULT_LIMIT, ge=1, le=USERS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    service: UserService = Depends(get_read_user_service),
+    current_user: User = Depends(get_current_user)  # Require authentication
+):
+    logger.debug(f"Request to search users q={q!r} limit={limit} cursor={cursor}")
+    page = await service.search_users(q, limit, cursor=cursor)
+    logger.info(f"Search returned {len(page.items)} users")
+    return page
 
 @router.get("/{user_id}", response_model=User)
 async def get_user_by_id(
     user_id: int,
-    service: UserService = Depends(get_user_service),
-    current_user: UserORM = Depends(get_current_user)  # Protejat cu JWT
+    request: Request,
+    response: Response,
+    service: UserService = Depends(get_read_user_service),
+    current_user: User = Depends(get_current_user)  # Protejat cu JWT
 ):
     try:
         logger.debug(f"Fetching user by id={user_id}")
         user = await service.get_user_by_id(user_id)
         logger.info(f"User found with id={user_id}")
+        headers = validator_headers(user_etag(user.id, user.version), user.updated_at)
+        if is_not_modified(request, headers["ETag"], user.updated_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
         return user
     except UserNotFoundException as not_found_exc:
         logger.warning(f"User not found with id={user_id}")
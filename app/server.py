@@ -0,0 +1,100 @@
+# app/server.py
+"""
+Production entry point:
+
+    python -m app.server                       # settings from the environment / .env
+    python -m app.server --workers 4 --port 9000
+
+Runs uvicorn with one worker process per CPU by default, uvloop and httptools when
+installed, and the keep-alive, backlog, worker recycling and graceful shutdown settings
+from app.core.config. On SIGTERM each worker fails /ready at once, keeps serving for
+SERVER_SHUTDOWN_DELAY_SECONDS (so load balancers stop routing to it), then stops
+accepting connections, waits up to SERVER_GRACEFUL_SHUTDOWN_SECONDS for in-flight
+requests and runs the app's shutdown hook (which disposes the database engines).
+
+Behind a proxy, set SERVER_FORWARDED_ALLOW_IPS to the proxies' addresses so the client
+IP (used by the per-IP login rate limit and the request logs) comes from X-Forwarded-For.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()  # before app.core.config reads the environment
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app.core.config import (
+    SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_BACKLOG, SERVER_KEEPALIVE_SECONDS,
+    SERVER_MAX_REQUESTS, SERVER_MAX_REQUESTS_JITTER, SERVER_GRACEFUL_SHUTDOWN_SECONDS, SERVER_ACCESS_LOG,
+    SERVER_PROXY_HEADERS, SERVER_FORWARDED_ALLOW_IPS,
+    LOG_LEVEL, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+)
+
+APP = "app.main:app"  # an import string, so every worker process imports the app itself
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def default_workers() -> int:
+    return SERVER_WORKERS or os.cpu_count() or 1
+
+def server_options(**overrides) -> dict:
+    """
+    Keyword arguments for uvicorn.run(APP, ...): the configured settings plus `overrides`.
+    """
+    options = {
+        "host": SERVER_HOST,
+        "port": SERVER_PORT,
+        "workers": default_workers(),
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "backlog": SERVER_BACKLOG,
+        "timeout_keep_alive": SERVER_KEEPALIVE_SECONDS,
+        "limit_max_requests": SERVER_MAX_REQUESTS or None,
+        "limit_max_requests_jitter": SERVER_MAX_REQUESTS_JITTER,
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        "access_log": SERVER_ACCESS_LOG,
+        "proxy_headers": SERVER_PROXY_HEADERS,
+        "forwarded_allow_ips": SERVER_FORWARDED_ALLOW_IPS,
+        "log_level": LOG_LEVEL.lower(),
+        "lifespan": "on",
+    }
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    return options
+
+def run(options: dict):
+    if options["workers"] == 1 and options["limit_max_requests"]:
+        # uvicorn only supervises (and so restarts) workers when there are several;
+        # a lone worker recycled after max requests would just exit
+        config = uvicorn.Config(APP, **options)
+        Multiprocess(config, sockets=[config.bind_socket()]).run()
+    else:
+        uvicorn.run(APP, **options)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int, help="worker processes (default: SERVER_WORKERS or CPU count)")
+    parser.add_argument("--max-requests", dest="limit_max_requests", type=int,
+                        help="recycle each worker after this many requests")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    options = server_options(**vars(parse_args(argv)))
+    # Every worker has its own connection pool; make the total visible to whoever sizes the database
+    print(
+        f"Starting {options['workers']} worker(s) on {options['host']}:{options['port']} "
+        f"(loop={options['loop']}, http={options['http']}, "
+        f"db connections up to {options['workers'] * (DB_POOL_SIZE + DB_MAX_OVERFLOW)})",
+        file=sys.stderr,
+    )
+    run(options)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,17 @@
 # app/services/auth_service.py
 import jwt
+import logging
 from datetime import datetime, timedelta
-from app.core.password_hashing import verify_password, hash_password
+from app.core.password_hashing import verify_password, hash_password, verify_and_update_async
+from app.core.cache import invalidate_user
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
-from app.exceptions.http_exceptions import UserNotFoundException
+from app.exceptions.http_exceptions import UserNotFoundException, PasswordHashingBusyException
 from app.models.token import TokenPayload
-from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.config import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.jwt_keys import key_set
+
+logger = logging.getLogger(__name__)
 
 class AuthService:
     def __init__(self, user_repository: UserRepository):
@@ -20,7 +25,7 @@ class AuthService:
 
     def hash_password(self, password: str) -> str:
         """
-        Hash plain password using bcrypt.
+        Hash plain password with the configured scheme and cost.
         """
         return hash_password(password)
 
@@ -28,28 +33,43 @@ class AuthService:
         """
         Verify user credentials:
         - fetch user by email
-        - verify password
+        - verify password (in the hashing pool, off the event loop)
+        - rehash and store it if the stored hash uses an outdated scheme/cost
         Returns User if valid, else None.
         """
-        user_orm = await self.user_repository.get_by_email(email)
+        # Give the connection back before the (slow) password check
+        user_orm = await self.user_repository.get_by_email(email, release_connection=True)
         if not user_orm:
             return None
         try:
-            if not self.verify_password(password, user_orm.hashed_password):
+            valid, new_hash = await verify_and_update_async(password, user_orm.hashed_password)
+            if not valid:
                 return None
+        except PasswordHashingBusyException:
+            raise
         except Exception:
             # If hash is invalid or any error occurs, treat as invalid credentials
             return None
-        return User.from_orm(user_orm)
+        user = User.from_orm(user_orm)
+        if new_hash:
+            try:
+                await self.user_repository.update_password_hash(user_orm.id, new_hash)
+                invalidate_user(user_orm.id)
+                logger.info(f"Upgraded password hash for user id={user_orm.id}")
+            except Exception as exc:
+                # The login itself succeeded; the rehash is retried on the next one
+                logger.warning(f"Could not store upgraded password hash for user id={user_orm.id}: {exc}")
+        return user
 
     def create_access_token(self, data: dict, expires_delta: timedelta | None = None) -> str:
         """
-        Create a JWT access token with payload data and expiry.
+        Create a JWT access token with payload data and expiry,
+        signed with the current key (its id goes in the `kid` header).
         """
         to_encode = data.copy()
         expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+        encoded_jwt = key_set.encode(to_encode)
         return encoded_jwt
 
     def decode_access_token(self, token: str) -> TokenPayload | None:
@@ -58,7 +78,7 @@ class AuthService:
         Returns None if invalid or expired.
         """
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = key_set.decode(token)
             token_data = TokenPayload(**payload)
             return token_data
         except jwt.PyJWTError:
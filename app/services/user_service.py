@@ -1,47 +1,237 @@
 # app/services/user_service.py
 
+import csv
+import io
 import logging
-from app.models.user import User, UserCreate
-from app.models.user_orm import UserORM
+import zlib
+from typing import Any, AsyncIterator
+
+from pydantic import ValidationError
+from app.models.user import (
+    User, UserCreate, UserPage, UserBulkItemResult, UserBulkResult, UserLookupItem, UserLookupResult,
+)
 from app.repositories.user_repository import UserRepository
 from app.exceptions.http_exceptions import DuplicateUserException, UserNotFoundException
-from app.core.password_hashing import hash_password  # ← updated import
+from app.core.password_hashing import hash_password_async, hash_passwords_async
+from app.core.cache import invalidate_user
+from app.database import mark_primary_write
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core import fast_json
+from app.core.etag import page_etag
+from app.core.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+EXPORT_COLUMNS = ("id", "name", "email")
+
+def _ndjson_chunk(rows: list[dict]) -> bytes:
+    return b"".join(fast_json.dumps(row) + b"\n" for row in rows)
+
+def _csv_chunk(rows: list[dict], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+# Shared by every UserService in this process: concurrent lookups of one id run one query
+user_lookups = SingleFlight()
+
 class UserService:
     def __init__(self, repository: UserRepository):
         self.repository = repository
 
     async def add_user(self, user: UserCreate) -> User:
-        logger.debug(f"Checking if user with email={user.email} already exists.")
-        existing = await self.repository.get_by_email(user.email)
-        if existing:
-            logger.error(f"Duplicate user detected with email={user.email}")
-            raise DuplicateUserException()
-
         logger.info(f"Adding new user with email={user.email}")
-        hashed_pwd = hash_password(user.password)  # ← hash the password
-        user_orm = UserORM(
+        hashed_pwd = await hash_password_async(user.password)  # ← hash the password in the worker pool
+        # One INSERT ... RETURNING; the unique index on email catches duplicates, even concurrent ones
+        user_orm = await self.repository.create(
             name=user.name,
             email=user.email,
-            hashed_password=hashed_pwd  # ← store hashed password (fix: use correct field name)
+            hashed_password=hashed_pwd
         )
-        user_orm = await self.repository.add(user_orm)
+        if user_orm is None:
+            logger.error(f"Duplicate user detected with email={user.email}")
+            raise DuplicateUserException()
+        invalidate_user(user_orm.id)
+        mark_primary_write()
         logger.info(f"User added successfully with id={user_orm.id}")
         return User.from_orm(user_orm)
 
+    async def bulk_add_users(self, rows: list[dict[str, Any]]) -> UserBulkResult:
+        """
+        Create many users at once: validate each row, drop duplicates (within the batch
+        and against the table, with one IN query), hash passwords in parallel and insert
+        everything in a single transaction. Returns one result per input row.
+        """
+        results: list[UserBulkItemResult | None] = [None] * len(rows)
+        pending: list[tuple[int, UserCreate]] = []
+        seen_emails = set()
+        for index, row in enumerate(rows):
+            try:
+                user = UserCreate.model_validate(row)
+            except ValidationError as exc:
+                results[index] = UserBulkItemResult(
+                    index=index,
+                    status="invalid",
+                    errors=exc.errors(include_url=False, include_context=False, include_input=False),
+                )
+                continue
+            if user.email in seen_emails:
+                results[index] = UserBulkItemResult(index=index, status="duplicate")
+                continue
+            seen_emails.add(user.email)
+            pending.append((index, user))
+
+        # Give the connection back before hashing the passwords
+        existing = await self.repository.get_existing_emails(
+            [user.email for _, user in pending], release_connection=True
+        )
+        to_create = []
+        for index, user in pending:
+            if user.email in existing:
+                results[index] = UserBulkItemResult(index=index, status="duplicate")
+            else:
+                to_create.append((index, user))
+
+        logger.info(f"Bulk adding {len(to_create)} of {len(rows)} users")
+        hashed = await hash_passwords_async([user.password for _, user in to_create])
+        created = await self.repository.add_many([
+            {"name": user.name, "email": user.email, "hashed_password": hashed_pwd}
+            for (_, user), hashed_pwd in zip(to_create, hashed)
+        ])
+        if created:
+            mark_primary_write()
+        created_by_email = {u.email: u for u in created}
+        for index, user in to_create:
+            user_orm = created_by_email.get(user.email)
+            if user_orm is None:
+                # Inserted concurrently by someone else after our duplicate check
+                results[index] = UserBulkItemResult(index=index, status="duplicate")
+            else:
+                invalidate_user(user_orm.id)
+                results[index] = UserBulkItemResult(index=index, status="created", user=User.from_orm(user_orm))
+
+        counts = {"created": 0, "duplicate": 0, "invalid": 0}
+        for item in results:
+            counts[item.status] += 1
+        logger.info(f"Bulk add finished: {counts}")
+        return UserBulkResult(
+            created=counts["created"],
+            duplicates=counts["duplicate"],
+            invalid=counts["invalid"],
+            results=results,
+        )
+
     async def get_all_users(self) -> list[User]:
         logger.debug("Fetching all users from repository.")
         users_orm = await self.repository.get_all()
         logger.info(f"Fetched {len(users_orm)} users.")
         return [User.from_orm(u) for u in users_orm]
 
+    async def list_users_page(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        email: str | None = None,
+        name: str | None = None,
+    ) -> UserPage:
+        after_id = decode_cursor(cursor) if cursor else None
+        logger.debug(f"Fetching users page after_id={after_id} limit={limit}")
+        users_orm = await self.repository.get_page(limit, after_id=after_id, email=email, name=name)
+        # A full page means there may be more rows; a short one is always the last
+        next_cursor = encode_cursor(users_orm[-1].id) if len(users_orm) == limit else None
+        return UserPage(items=[User.from_orm(u) for u in users_orm], next_cursor=next_cursor)
+
+    async def list_users_page_json(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        email: str | None = None,
+        name: str | None = None,
+    ) -> tuple[bytes, str | None, str]:
+        """
+        Same result as `list_users_page`: the items encoded straight from the selected
+        columns to a JSON array, plus the next cursor. Skips building and re-validating
+        a Pydantic model per row; the rows were validated when they were written. Also
+        returns the page's ETag.
+        """
+        after_id = decode_cursor(cursor) if cursor else None
+        rows = await self.repository.get_page_rows(limit, after_id=after_id, email=email, name=name)
+        etag = page_etag([(r["id"], r.pop("version")) for r in rows])
+        next_cursor = encode_cursor(rows[-1]["id"]) if len(rows) == limit else None
+        return fast_json.dumps(rows), next_cursor, etag
+
+    async def list_users_page_etag(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        email: str | None = None,
+        name: str | None = None,
+    ) -> str:
+        """
+        ETag of a page from (id, version) only.
+        """
+        after_id = decode_cursor(cursor) if cursor else None
+        return page_etag(await self.repository.get_page_versions(limit, after_id=after_id, email=email, name=name))
+
+    async def search_users(self, q: str, limit: int, cursor: str | None = None) -> UserPage:
+        after_id = decode_cursor(cursor) if cursor else None
+        logger.debug(f"Searching users q={q!r} after_id={after_id} limit={limit}")
+        users_orm = await self.repository.search(q, limit, after_id=after_id)
+        next_cursor = encode_cursor(users_orm[-1].id) if len(users_orm) == limit else None
+        return UserPage(items=[User.from_orm(u) for u in users_orm], next_cursor=next_cursor)
+
+    async def export_users(self, fmt: str, batch_size: int, compress: bool = False) -> AsyncIterator[bytes]:
+        """
+        The whole users table as NDJSON or CSV, one encoded (and optionally gzipped)
+        chunk per cursor batch. The header row (CSV) goes out before the first query.
+        """
+        compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+
+        def emit(data: bytes) -> bytes:
+            # SYNC_FLUSH pushes each chunk out instead of waiting for a full deflate window
+            return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH) if compressor else data
+
+        exported = 0
+        if fmt == "csv":
+            yield emit(_csv_chunk([], header=True))
+        async for rows in self.repository.stream_rows(batch_size):
+            exported += len(rows)
+            yield emit(_csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(rows))
+        if compressor:
+            yield compressor.flush()
+        logger.info(f"Exported {exported} users as {fmt}{' (gzip)' if compress else ''}")
+
+    async def lookup_users(self, user_ids: list[int]) -> UserLookupResult:
+        """
+        Resolve many ids with one query. Results follow the request order, with an
+        explicit not-found entry for ids that don't exist.
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        logger.debug(f"Looking up {len(unique_ids)} users by id")
+        found = {u.id: User.from_orm(u) for u in await self.repository.get_many_by_ids(unique_ids)}
+        return UserLookupResult(results=[
+            UserLookupItem(id=user_id, found=user_id in found, user=found.get(user_id))
+            for user_id in user_ids
+        ])
+
+    async def find_user_by_id(self, user_id: int) -> User | None:
+        """
+        Look a user up by id. Concurrent calls for the same id share one query.
+        """
+        async def load() -> User | None:
+            user_orm = await self.repository.get_by_id(user_id)
+            return User.from_orm(user_orm) if user_orm is not None else None
+
+        return await user_lookups.do(user_id, load)
+
     async def get_user_by_id(self, user_id: int) -> User:
         logger.debug(f"Fetching user with id={user_id}")
-        user_orm = await self.repository.get_by_id(user_id)
-        if user_orm is None:
+        user = await self.find_user_by_id(user_id)
+        if user is None:
             logger.warning(f"User not found with id={user_id}")
             raise UserNotFoundException()
         logger.info(f"User found with id={user_id}")
-        return User.from_orm(user_orm)
+        return user
@@ -0,0 +1,210 @@
+# benchmarks/bench_api.py
+"""
+In-process load/latency benchmark for the auth and user endpoints.
+
+Drives the FastAPI `app` over ASGI (no network, no uvicorn) against a seeded database
+and reports requests/sec and p50/p95/p99 latency per endpoint as JSON.
+
+    python -m benchmarks.bench_api --users 10000 --requests 500 --concurrency 20
+    python -m benchmarks.bench_api --save-baseline              # store the current numbers
+    python -m benchmarks.bench_api --baseline benchmarks/baseline.json  # exit 1 on regression
+
+A baseline is only comparable when it was recorded with the same database backend,
+users, requests, concurrency and endpoints; otherwise the comparison is refused (exit 2).
+
+By default a fresh SQLite file is used; pass --database-url for Postgres (the
+users table is dropped and re-seeded, so never point it at real data).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+ENDPOINTS = ("login", "list_users", "get_user")
+SCENARIO_KEYS = ("database", "users", "requests", "concurrency", "endpoints")  # must match to compare runs
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="async SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--users", type=int, default=1000, help="number of users to seed")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent in-flight requests")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--output", help="write the JSON report to this file as well as stdout")
+    parser.add_argument("--baseline", help="compare against this baseline report and fail on regression")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown vs baseline")
+    return parser.parse_args(argv)
+
+def configure_environment(args) -> str:
+    """
+    Settings must be in place before the app modules are imported.
+    """
+    database_url = args.database_url or "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")  # the benchmark logs in from one client
+    os.environ.setdefault("DB_ECHO", "false")
+    return database_url
+
+async def seed(user_count: int, password: str):
+    from sqlalchemy import insert
+    from app.database import get_engine, Base
+    from app.migrations import upgrade, schema_version_table
+    from app.models.user_orm import UserORM
+    from app.core.password_hashing import hash_password
+
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(schema_version_table.drop, checkfirst=True)
+    await upgrade()
+    async with get_engine().begin() as conn:
+        hashed = hash_password(password)  # one hash for every row keeps seeding fast
+        rows = [{"name": f"Bench User {i}", "email": f"bench{i}@example.com", "hashed_password": hashed}
+                for i in range(user_count)]
+        for start in range(0, len(rows), 5000):
+            await conn.execute(insert(UserORM), rows[start:start + 5000])
+
+async def run_endpoint(client, make_request, total: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await make_request()
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "requests_per_second": round(total / wall, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+async def run(args) -> dict:
+    from httpx import AsyncClient, ASGITransport
+    from app.main import app
+    from app.core.jwt_keys import key_set
+
+    password = "bench-password"
+    await seed(args.users, password)
+    key_set.ensure_keys()  # the startup hook isn't run through ASGITransport
+    credentials = {"email": "bench0@example.com", "password": password}
+
+    results = {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        login = await client.post("/login", json=credentials)
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        requests = {
+            "login": lambda: client.post("/login", json=credentials),
+            "list_users": lambda: client.get("/users/", params={"limit": 50}, headers=headers),
+            "get_user": lambda: client.get(f"/users/{random.randint(1, args.users)}", headers=headers),
+        }
+        for name in args.endpoints:
+            results[name] = await run_endpoint(client, requests[name], args.requests, args.concurrency)
+
+    from app.database import dispose_engines
+    await dispose_engines()
+    return results
+
+def scenario_mismatches(report: dict, baseline: dict) -> list[str]:
+    """
+    Scenario settings that differ between this run and the baseline (the numbers aren't comparable then).
+    """
+    current, previous = report.get("config", {}), baseline.get("config", {})
+    return [
+        f"{key}: {current.get(key)!r} vs baseline {previous.get(key)!r}"
+        for key in SCENARIO_KEYS
+        if current.get(key) != previous.get(key)
+    ]
+
+def _error_rate(result: dict) -> float:
+    return result.get("errors", 0) / result["requests"] if result.get("requests") else 0.0
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Regressions are any failed request, an error rate above the baseline's, throughput
+    below (1 - tolerance) x baseline or p95 above (1 + tolerance) x baseline.
+    """
+    regressions = []
+    for name, current in report["results"].items():
+        if current["errors"] > 0:
+            regressions.append(f"{name}: {current['errors']} of {current['requests']} requests failed")
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        if _error_rate(current) > _error_rate(previous):
+            regressions.append(
+                f"{name}: error rate {_error_rate(current):.2%} vs baseline {_error_rate(previous):.2%}"
+            )
+        if current["requests_per_second"] < previous["requests_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {current['requests_per_second']} req/s vs baseline {previous['requests_per_second']}"
+            )
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms vs baseline {previous['p95_ms']} ms")
+    return regressions
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    database_url = configure_environment(args)
+    results = asyncio.run(run(args))
+    report = {
+        "config": {
+            "database": database_url.split("://", 1)[0],
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "endpoints": args.endpoints,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(output + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatches = scenario_mismatches(report, baseline)
+        if mismatches:
+            print("Baseline not comparable, scenario differs:\n  " + "\n  ".join(mismatches), file=sys.stderr)
+            return 2
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("PERFORMANCE REGRESSION:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
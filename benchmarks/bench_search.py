@@ -0,0 +1,177 @@
+# benchmarks/bench_search.py
+"""
+Search latency vs table size for GET /users/search.
+
+Grows the users table step by step (default 10k -> 100k -> 1M rows) and, at each size,
+times `UserRepository.search` for random selective queries (an email fragment of one
+user, a name fragment of one user). With the trigram indexes in place the latency
+should stay roughly flat as the table grows; `--compare-scan` also times the same
+queries as a full table scan, which grows linearly. (On Postgres the pg_trgm indexes
+would serve a plain ILIKE too, so the scan runs with index and bitmap scans disabled.)
+
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --sizes 10000 100000 --queries 200
+    python -m benchmarks.bench_search --database-url postgresql+asyncpg://...  # drops users!
+
+Queries that match a large share of the table (e.g. "example.com") are bounded by the
+number of matches rather than the table size; those are not what this measures.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_api import percentile
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="async SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="table sizes to measure at, ascending")
+    parser.add_argument("--queries", type=int, default=500, help="searches per size")
+    parser.add_argument("--limit", type=int, default=50, help="page size")
+    parser.add_argument("--compare-scan", action="store_true", help="also time a full table scan")
+    parser.add_argument("--output", help="write the JSON report to this file as well as stdout")
+    return parser.parse_args(argv)
+
+def configure_environment(args) -> str:
+    database_url = args.database_url or "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("DB_ECHO", "false")
+    return database_url
+
+FIRST_NAMES = ("Ada", "Alan", "Grace", "Linus", "Barbara", "Dennis", "Margaret", "Ken", "Edsger", "Frances")
+LAST_NAMES = ("Lovelace", "Turing", "Hopper", "Torvalds", "Liskov", "Ritchie", "Hamilton", "Thompson")
+
+def make_row(i: int) -> dict:
+    # The hex suffix makes every name findable by a selective fragment
+    return {
+        "name": f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i % len(LAST_NAMES)]} {i:x}z",
+        "email": f"user{i}@example.com",
+        "hashed_password": "x",
+    }
+
+async def reset_schema():
+    from app.database import get_engine, Base
+    from app.migrations import upgrade, schema_version_table
+
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(schema_version_table.drop, checkfirst=True)
+    await upgrade()
+
+async def grow(start: int, stop: int):
+    from sqlalchemy import insert
+    from app.database import get_engine
+    from app.models.user_orm import UserORM
+
+    async with get_engine().begin() as conn:
+        for chunk in range(start, stop, 10_000):
+            await conn.execute(insert(UserORM), [make_row(i) for i in range(chunk, min(chunk + 10_000, stop))])
+        if conn.dialect.name == "postgresql":
+            await conn.exec_driver_sql("ANALYZE users")
+
+async def force_table_scans(session):
+    """
+    On Postgres, turn off index and bitmap scans for the session's current transaction
+    (SET LOCAL, undone when the session rolls back), since the pg_trgm GIN indexes
+    serve ILIKE. SQLite's ILIKE (lower() LIKE) can't use the FTS table anyway.
+    """
+    from sqlalchemy import text
+
+    if session.get_bind().dialect.name == "postgresql":
+        for setting in ("enable_indexscan", "enable_indexonlyscan", "enable_bitmapscan"):
+            await session.execute(text(f"SET LOCAL {setting} = off"))
+
+def scan_search(session, q: str, limit: int):
+    """
+    The same search as a plain ILIKE; a full scan once `force_table_scans` ran.
+    """
+    from sqlalchemy import or_, select
+    from app.models.user_orm import UserORM
+
+    pattern = f"%{q}%"
+    query = (
+        select(UserORM)
+        .where(or_(UserORM.name.ilike(pattern), UserORM.email.ilike(pattern)))
+        .order_by(UserORM.id)
+        .limit(limit)
+    )
+    return session.scalars(query)
+
+async def measure(size: int, queries: int, limit: int, scan: bool = False) -> dict:
+    from app.database import async_session_factory, get_engine
+    from app.repositories.user_repository import UserRepository
+
+    latencies = []
+    misses = 0
+    async with async_session_factory(bind=get_engine()) as session:
+        repo = UserRepository(session)
+        if scan:
+            await force_table_scans(session)
+        for n in range(queries):
+            i = random.randrange(size)
+            q = f"user{i}@" if n % 2 else f"{i:x}z"
+            start = time.perf_counter()
+            found = (await scan_search(session, q, limit)).all() if scan else await repo.search(q, limit)
+            latencies.append(time.perf_counter() - start)
+            misses += not found
+            session.expunge_all()
+    latencies.sort()
+    return {
+        "rows": size,
+        "method": "scan" if scan else "index",
+        "queries": queries,
+        "misses": misses,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+async def run(args) -> list[dict]:
+    from app.database import dispose_engines
+
+    await reset_schema()
+    results = []
+    seeded = 0
+    for size in sorted(args.sizes):
+        seed_start = time.perf_counter()
+        await grow(seeded, size)
+        seeded = size
+        print(f"seeded {size} rows in {time.perf_counter() - seed_start:.1f}s", file=sys.stderr)
+        results.append(await measure(size, args.queries, args.limit))
+        if args.compare_scan:
+            results.append(await measure(size, args.queries, args.limit, scan=True))
+    await dispose_engines()
+    return results
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    database_url = configure_environment(args)
+    results = asyncio.run(run(args))
+    indexed = [r for r in results if r["method"] == "index"]
+    report = {
+        "config": {
+            "database": database_url.split("://", 1)[0],
+            "queries": args.queries,
+            "limit": args.limit,
+        },
+        "results": results,
+        # p50 at the largest size relative to the smallest; ~1 means flat
+        "p50_growth": round(indexed[-1]["p50_ms"] / max(indexed[0]["p50_ms"], 1e-6), 2),
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
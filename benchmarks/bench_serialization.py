@@ -0,0 +1,91 @@
+# benchmarks/bench_serialization.py
+"""
+Per-row cost of serializing a users page: the default path vs the fast JSON path.
+
+Default path (what list_users does without FAST_JSON_RESPONSES):
+  ORM rows -> User.from_orm per row -> page ETag -> List[User] response_model
+  validation -> jsonable_encoder -> JSONResponse (stdlib json)
+Fast path (FAST_JSON_RESPONSES=true, list_users_page_json):
+  selected column rows (RowMapping) -> dict per row -> pop version into the page ETag
+  -> fast_json.dumps
+
+Both sides start from what the database driver handed back (fetched once from an
+in-memory SQLite table), so the numbers cover the same end-to-end work.
+
+    python -m benchmarks.bench_serialization --rows 200 --repeat 200
+"""
+import argparse
+import json
+import sys
+import time
+import warnings
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=200, help="pages serialized per measurement")
+    return parser.parse_args(argv)
+
+def measure(func, repeat: int) -> float:
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from sqlalchemy import create_engine, insert, select
+    from sqlalchemy.orm import Session
+    from app.core import fast_json
+    from app.core.etag import page_etag
+    from app.database import Base
+    from app.models.user import User
+    from app.models.user_orm import UserORM
+
+    warnings.simplefilter("ignore", DeprecationWarning)  # from_orm is what the default path uses
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine, expire_on_commit=False) as session:
+        session.execute(insert(UserORM), [
+            {"name": f"User {i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+            for i in range(1, args.rows + 1)
+        ])
+        session.commit()
+        orm_rows = session.scalars(select(UserORM).order_by(UserORM.id)).all()
+        # Same columns as UserRepository.get_page_rows
+        mapping_rows = session.execute(
+            select(UserORM.id, UserORM.name, UserORM.email, UserORM.version).order_by(UserORM.id)
+        ).mappings().all()
+    page_adapter = TypeAdapter(list[User])
+
+    def default_path():
+        items = [User.from_orm(u) for u in orm_rows]
+        page_etag((u.id, u.version) for u in items)
+        validated = page_adapter.validate_python(items, from_attributes=True)  # response_model check
+        return JSONResponse(jsonable_encoder(validated)).body
+
+    def fast_path():
+        # Mirrors get_page_rows + UserService.list_users_page_json
+        rows = [dict(row) for row in mapping_rows]
+        page_etag([(r["id"], r.pop("version")) for r in rows])
+        return fast_json.dumps(rows)
+
+    assert json.loads(default_path()) == json.loads(fast_path())
+    default_seconds = measure(default_path, args.repeat)
+    fast_seconds = measure(fast_path, args.repeat)
+    report = {
+        "rows": args.rows,
+        "encoder": "orjson" if fast_json.orjson is not None else "json",
+        "default_us_per_row": round(default_seconds / args.rows * 1e6, 3),
+        "fast_us_per_row": round(fast_seconds / args.rows * 1e6, 3),
+        "speedup": round(default_seconds / fast_seconds, 1),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
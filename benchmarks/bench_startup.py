@@ -0,0 +1,54 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start measurement: runs a fresh interpreter per sample, imports app.main and
+serves one request over ASGI, then reports import time, time to first request and
+whether the import pulled in a database driver (it should not).
+
+    python -m benchmarks.bench_startup --samples 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_CHILD = r"""
+import asyncio, json, sys
+import app.main
+drivers_imported = sorted(m for m in ("asyncpg", "aiosqlite") if m in sys.modules)
+from httpx import AsyncClient, ASGITransport
+
+async def first_request():
+    async with AsyncClient(transport=ASGITransport(app=app.main.app), base_url="http://startup") as client:
+        (await client.get("/metrics")).raise_for_status()
+
+asyncio.run(first_request())
+print(json.dumps({**app.main.startup_timer.stats(), "drivers_imported_at_import": drivers_imported}))
+"""
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING")}
+    samples = []
+    for _ in range(args.samples):
+        output = subprocess.run(
+            [sys.executable, "-c", _CHILD], cwd=root, env=env, check=True, capture_output=True, text=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    report = {
+        "samples": args.samples,
+        "import_seconds_median": statistics.median(s["import_seconds"] for s in samples),
+        "first_request_seconds_median": statistics.median(s["first_request_seconds"] for s in samples),
+        "drivers_imported_at_import": samples[0]["drivers_imported_at_import"],
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
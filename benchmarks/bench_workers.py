@@ -0,0 +1,173 @@
+# benchmarks/bench_workers.py
+"""
+Smoke benchmark for the launcher: throughput vs worker count over real HTTP.
+
+For each worker count, starts `python -m app.server --workers N` against a seeded
+SQLite file, drives an authenticated GET /users/ from several client processes for a
+fixed time and reports requests/sec and latency percentiles as JSON.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 --duration 10
+
+Throughput can only scale up to the number of CPUs (shared with the clients); on a
+single-CPU machine every row will look the same.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_api import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "bench-password"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to compare")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load per worker count")
+    parser.add_argument("--clients", type=int, default=max(2, (os.cpu_count() or 1) // 2),
+                        help="client processes generating load")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests per client process")
+    parser.add_argument("--users", type=int, default=1000, help="number of users to seed")
+    parser.add_argument("--output", help="write the JSON report to this file as well as stdout")
+    return parser.parse_args(argv)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def prepare(users: int) -> dict:
+    """
+    Seed the database and create the signing keys once, in a child interpreter, so the
+    workers start against a ready schema and share one key. Returns the server environment.
+    """
+    workdir = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "DATABASE_URL": "sqlite+aiosqlite:///" + os.path.join(workdir, "bench.db"),
+        "JWT_KEYS_DIR": os.path.join(workdir, "keys"),
+        "LOGIN_RATE_LIMIT_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+        "DB_ECHO": "false",
+    }
+    seed = (
+        "import asyncio; from benchmarks.bench_api import seed; from app.core.jwt_keys import key_set; "
+        f"asyncio.run(seed({users}, {PASSWORD!r})); key_set.ensure_keys()"
+    )
+    subprocess.run([sys.executable, "-c", seed], cwd=ROOT, env=env, check=True)
+    return env
+
+def wait_until_up(base_url: str, process: subprocess.Popen, timeout: float = 60):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            httpx.get(base_url + "/ready", timeout=1).raise_for_status()
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start in time")
+
+def client_process(base_url: str, token: str, duration: float, concurrency: int, results):
+    import httpx
+
+    async def load():
+        latencies, errors = [], 0
+        deadline = time.monotonic() + duration
+        headers = {"Authorization": f"Bearer {token}"}
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+            async def worker():
+                nonlocal errors
+                while time.monotonic() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        response = await client.get("/users/", params={"limit": 50})
+                        errors += response.status_code >= 400
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - start)
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, errors
+
+    results.put(asyncio.run(load()))
+
+def run_workers(workers: int, env: dict, args) -> dict:
+    import httpx
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up(base_url, server)
+        login = httpx.post(base_url + "/login", json={"email": "bench0@example.com", "password": PASSWORD}, timeout=30)
+        login.raise_for_status()
+        token = login.json()["access_token"]
+
+        results = multiprocessing.Queue()
+        clients = [
+            multiprocessing.Process(target=client_process, args=(base_url, token, args.duration, args.concurrency, results))
+            for _ in range(args.clients)
+        ]
+        wall_start = time.perf_counter()
+        for client in clients:
+            client.start()
+        collected = [results.get() for _ in clients]
+        for client in clients:
+            client.join()
+        wall = time.perf_counter() - wall_start
+    finally:
+        server.terminate()  # SIGTERM: graceful shutdown
+        server.wait(timeout=60)
+
+    latencies = sorted(l for client_latencies, _ in collected for l in client_latencies)
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in collected),
+        "requests_per_second": round(len(latencies) / wall, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    env = prepare(args.users)
+    results = [run_workers(workers, env, args) for workers in args.workers]
+    baseline = results[0]["requests_per_second"] or 1
+    for result in results:
+        result["speedup"] = round(result["requests_per_second"] / baseline, 2)
+    report = {
+        "config": {
+            "cpus": os.cpu_count(),
+            "duration_seconds": args.duration,
+            "clients": args.clients,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,13 @@
 # test_db.py
 import asyncio
-from app.database import engine, Base
+from app.migrations import upgrade, SCHEMA_VERSION
+from app.database import get_engine
 
 async def init_db():
-    # Create all tables in the DB (no-op if they already exist)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print("✅ Tables created (or already exist)")
+    # Create or migrate the schema (no-op if it is already current)
+    await upgrade()
+    await get_engine().dispose()
+    print(f"✅ Database schema at version {SCHEMA_VERSION}")
 
 if __name__ == "__main__":
     asyncio.run(init_db())
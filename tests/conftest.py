@@ -1,5 +1,6 @@
-import sys, os
+import sys, os, tempfile
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault("JWT_KEYS_DIR", tempfile.mkdtemp())  # keep test signing keys out of the repo
 
 import pytest
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
@@ -30,3 +31,47 @@ async def user_repository(session):
 @pytest.fixture
 async def user_service(user_repository):
     return UserService(user_repository)
+
+
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from app.database import get_session, get_read_session
+from app.core.cache import token_claims_cache, user_cache
+from app.core.rate_limit import login_rate_limiter, InMemoryTokenBucketBackend
+from app.core.jwt_keys import key_set
+
+
+@pytest_asyncio.fixture
+async def sqlite_session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def api_client(sqlite_session_factory):
+    from app.main import app
+
+    async def override_get_session():
+        async with sqlite_session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    token_claims_cache.clear()
+    user_cache.clear()
+    login_rate_limiter.backend = InMemoryTokenBucketBackend()
+    key_set.ensure_keys()  # normally done by the startup hook, which ASGITransport doesn't run
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+async def create_and_login(client, email="alice@example.com", password="secret", name="Alice"):
+    resp = await client.post("/users/", json={"name": name, "email": email, "password": password})
+    assert resp.status_code == 201, resp.text
+    resp = await client.post("/login", json={"email": email, "password": password})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
@@ -0,0 +1,23 @@
+import pytest
+from conftest import create_and_login
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_per_row_status(api_client):
+    headers = await create_and_login(api_client, email="admin@example.com")
+    rows = [
+        {"name": "New", "email": "new@example.com", "password": "pw"},
+        {"name": "Admin again", "email": "admin@example.com", "password": "pw"},
+        {"name": "Bad", "email": "not-an-email", "password": "pw"},
+        {"name": "New twice", "email": "new@example.com", "password": "pw"},
+        {"name": "Other", "email": "other@example.com", "password": "pw"},
+    ]
+    resp = await api_client.post("/users/bulk", json={"users": rows}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert [r["status"] for r in body["results"]] == ["created", "duplicate", "invalid", "duplicate", "created"]
+    assert (body["created"], body["duplicates"], body["invalid"]) == (2, 2, 1)
+    assert body["results"][2]["errors"][0]["loc"] == ["email"]
+
+    login = await api_client.post("/login", json={"email": "other@example.com", "password": "pw"})
+    assert login.status_code == 200
@@ -0,0 +1,85 @@
+import pytest
+from conftest import create_and_login
+from app.repositories.user_repository import UserRepository
+
+
+@pytest.mark.asyncio
+async def test_user_etag_and_not_modified(api_client):
+    headers = await create_and_login(api_client)
+    first = await api_client.get("/users/1", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert "version" not in first.json()
+
+    cached = await api_client.get("/users/1", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    since = await api_client.get("/users/1", headers={**headers, "If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_page_etag_changes_when_rows_change(api_client):
+    headers = await create_and_login(api_client)
+    first = await api_client.get("/users/", headers=headers)
+    etag = first.headers["etag"]
+
+    unchanged = await api_client.get("/users/", headers={**headers, "If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    await api_client.post("/users/", json={"name": "Bob", "email": "bob@example.com", "password": "pw"})
+    changed = await api_client.get("/users/", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_page_has_no_last_modified(api_client):
+    headers = await create_and_login(api_client)
+    first = await api_client.get("/users/", headers=headers)
+    assert "last-modified" not in first.headers
+
+    since = await api_client.get("/users/", headers={**headers, "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert since.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_password_rehash_keeps_validators(api_client, sqlite_session_factory):
+    headers = await create_and_login(api_client)
+    before = await api_client.get("/users/1", headers=headers)
+
+    async with sqlite_session_factory() as session:
+        repository = UserRepository(session)
+        await repository.update_password_hash(1, "rehashed")
+        await session.commit()
+        user = await repository.get_by_id(1)
+        assert user.hashed_password == "rehashed"
+        assert user.version == 1
+
+    after = await api_client.get("/users/1", headers={**headers, "If-None-Match": before.headers["etag"]})
+    assert after.status_code == 304
+    assert after.headers["last-modified"] == before.headers["last-modified"]
+
+
+@pytest.mark.asyncio
+async def test_name_change_changes_etags(api_client, sqlite_session_factory):
+    headers = await create_and_login(api_client)
+    user_before = await api_client.get("/users/1", headers=headers)
+    page_before = await api_client.get("/users/", headers=headers)
+
+    async with sqlite_session_factory() as session:
+        user = await UserRepository(session).get_by_id(1)
+        user.name = "Alice Smith"
+        await session.commit()
+        assert user.version == 2
+
+    user_after = await api_client.get("/users/1", headers={**headers, "If-None-Match": user_before.headers["etag"]})
+    assert user_after.status_code == 200
+    assert user_after.headers["etag"] != user_before.headers["etag"]
+    assert user_after.json()["name"] == "Alice Smith"
+
+    page_after = await api_client.get("/users/", headers={**headers, "If-None-Match": page_before.headers["etag"]})
+    assert page_after.status_code == 200
+    assert page_after.headers["etag"] != page_before.headers["etag"]
@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+from app.database import build_engine, get_pool_stats
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_checkouts(tmp_path):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        assert get_pool_stats(engine)["checked_out"] == 1
+    stats = get_pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 1
+    assert stats["wait_seconds_max"] >= 0
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_separate_timeouts_from_connect_errors(tmp_path, monkeypatch):
+    from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+    from app import database
+
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(database, "DB_POOL_TIMEOUT", 0.05)
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    async with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            async with engine.connect():
+                pass
+    broken = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'pool.db'}")
+    with pytest.raises(OperationalError):
+        async with broken.connect():
+            pass
+
+    assert get_pool_stats(engine)["timeouts"] == 1
+    assert get_pool_stats(engine)["connect_errors"] == 0
+    assert get_pool_stats(broken)["timeouts"] == 0
+    assert get_pool_stats(broken)["connect_errors"] == 1
+    await engine.dispose()
+    await broken.dispose()
@@ -0,0 +1,56 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+import pytest
+from app.core.jwt_keys import KeySet
+
+
+def test_tokens_carry_kid_and_verify_after_rotation(tmp_path):
+    keys = KeySet(keys_dir=str(tmp_path), algorithm="EdDSA", prepublish_seconds=3600)
+    keys.ensure_keys()
+    token = keys.encode({"sub": "1"})
+    first_kid = jwt.get_unverified_header(token)["kid"]
+    assert keys.decode(token)["sub"] == "1"
+
+    # A scheduled key is published in the JWKS before it signs anything
+    next_kid = keys.generate_key(activate_in=3600)
+    keys.load()
+    published = {k["kid"] for k in json.loads(keys.jwks())["keys"]}
+    assert published == {first_kid, next_kid}
+    assert keys.signing_key().kid == first_kid
+
+
+def test_unknown_kid_is_rejected(tmp_path):
+    keys = KeySet(keys_dir=str(tmp_path), algorithm="EdDSA")
+    other = KeySet(keys_dir=str(tmp_path / "other"), algorithm="EdDSA")
+    keys.ensure_keys()
+    other.ensure_keys()
+    with pytest.raises(jwt.PyJWTError):
+        keys.decode(other.encode({"sub": "1", "exp": int(time.time()) + 60}))
+
+
+def test_signing_never_generates_keys(tmp_path):
+    keys = KeySet(keys_dir=str(tmp_path), algorithm="EdDSA")
+    with pytest.raises(RuntimeError):
+        keys.encode({"sub": "1"})
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".pem")]
+
+
+def test_concurrent_workers_generate_one_key(tmp_path):
+    # Separate KeySets stand in for worker processes sharing the key directory
+    workers = [KeySet(keys_dir=str(tmp_path), algorithm="EdDSA") for _ in range(8)]
+    with ThreadPoolExecutor(len(workers)) as pool:
+        list(pool.map(lambda keys: keys.ensure_keys(), workers))
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".pem")]) == 1
+    assert len({keys.jwks() for keys in workers}) == 1
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint(api_client):
+    resp = await api_client.get("/.well-known/jwks.json")
+    assert resp.status_code == 200
+    assert "max-age" in resp.headers["cache-control"]
+    assert resp.json()["keys"][0]["kty"] == "OKP"
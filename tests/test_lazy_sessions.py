@@ -0,0 +1,71 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from app.core.cache import token_claims_cache, user_cache
+from app.core.startup import startup_timer
+from app.database import Base, async_session_factory, build_engine, get_read_session, get_session
+from app.models.user_orm import UserORM
+from app.repositories.user_repository import UserRepository
+from conftest import create_and_login
+
+
+@pytest_asyncio.fixture
+async def pooled_engine(tmp_path):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_release_their_connection(pooled_engine):
+    async with async_session_factory(bind=pooled_engine) as session:
+        repo = UserRepository(session)
+        assert pooled_engine.pool.checkedout() == 0  # opening a session checks nothing out
+        created = await repo.create("Ada", "ada@example.com", "x")
+        assert pooled_engine.pool.checkedout() == 0
+        user = await repo.get_by_email("ada@example.com", release_connection=True)
+        assert pooled_engine.pool.checkedout() == 0  # released before the session closes
+        assert user.id == created.id and user.name == "Ada"  # still loaded after the release
+
+        # Plain reads leave the caller's transaction (and pending work) alone
+        session.add(UserORM(name="Bob", email="bob@example.com", hashed_password="x"))
+        await repo.get_by_id(created.id)
+        assert session.in_transaction() and pooled_engine.pool.checkedout() == 1
+        await session.rollback()
+        assert await repo.get_by_email("bob@example.com") is None
+
+
+@pytest_asyncio.fixture
+async def pooled_client(pooled_engine):
+    from app.main import app
+
+    async def override_get_session():
+        async with async_session_factory(bind=pooled_engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    token_claims_cache.clear()
+    user_cache.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_rejected_requests_and_probes_never_check_out(pooled_client, pooled_engine, monkeypatch):
+    pool = pooled_engine.pool
+    before = pool.checkouts
+    assert (await pooled_client.get("/users/1", headers={"Authorization": "Bearer nope"})).status_code == 401
+    assert (await pooled_client.post("/users/", json={"name": "x"})).status_code == 422
+    assert (await pooled_client.get("/health")).json() == {"status": "ok"}
+    assert (await pooled_client.get("/ready")).status_code == 503  # lifespan startup never ran here
+    monkeypatch.setattr(startup_timer, "startup_seconds", 0.1)
+    assert (await pooled_client.get("/ready")).json() == {"status": "ready"}
+    assert pool.checkouts == before
+
+    headers = await create_and_login(pooled_client)
+    assert (await pooled_client.get("/users/1", headers=headers)).status_code == 200
+    assert pool.checkedout() == 0
@@ -0,0 +1,71 @@
+import gzip
+import json
+from app.log_analytics import LatencyHistogram, LogReport, RouteMatcher, format_text, main, rotated_log_files
+
+
+def request_line(ts, url, status, ms, route=None):
+    record = {"timestamp": ts, "level": "INFO", "name": "pep2-backend", "message": "HTTP request completed",
+              "method": "GET", "url": url, "status_code": status, "process_time_ms": ms}
+    if route:
+        record["route"] = route
+    return json.dumps(record) + "\n"
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.add(float(value))
+    assert abs(histogram.percentile(50) - 500) <= 5
+    assert abs(histogram.percentile(99) - 990) <= 10
+    assert histogram.percentile(100) == 1000
+
+
+def test_rotated_files_are_streamed_oldest_first(tmp_path, capsys):
+    log = tmp_path / "app.log"
+    with gzip.open(f"{log}.2.gz", "wt") as f:
+        f.write(request_line("2025-06-14 21:10:00,000", "http://h/users/7", 200, 5.0))
+        f.write(request_line("2025-06-14 21:20:00,000", "http://h/users/", 500, 900.0))
+    (tmp_path / "app.log.1").write_text(
+        request_line("2025-06-14 22:05:00,000", "/users/8", 404, 3.0, route="/users/{user_id}")
+        + json.dumps({"timestamp": "2025-06-14 22:05:01,000", "level": "ERROR", "name": "pep2-backend",
+                      "message": "Unexpected error fetching user id=8"}) + "\n"
+        + "not json\n"
+    )
+    log.write_text(json.dumps({"timestamp": "2025-06-14 22:06:00,000", "level": "ERROR", "name": "pep2-backend",
+                               "message": "Unexpected error fetching user id=9"}) + "\n")
+
+    assert rotated_log_files(str(log)) == [f"{log}.2.gz", f"{log}.1", str(log)]
+
+    assert main(["--format", "json", "--top", "1", *rotated_log_files(str(log))]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["requests"] == 3
+    assert report["malformed_lines"] == 1
+    # Legacy URL-only lines land on the same route template as new ones
+    assert report["routes"]["GET /users/{user_id}"]["statuses"] == {"200": 1, "404": 1}
+    assert [w["start"] for w in report["windows"]] == ["2025-06-14 21:00:00", "2025-06-14 22:00:00"]
+    assert [r["process_time_ms"] for r in report["slowest_requests"]] == [900.0]
+    assert report["server_errors_by_route"] == {"GET /users/": 1}
+    assert report["top_error_sources"] == {"pep2-backend: Unexpected error fetching user id=N": 2}
+
+
+def test_text_report_renders_sections():
+    report = LogReport(window_minutes=15)
+    report.add_line(request_line("2025-06-14 21:10:00,000", "/users/", 200, 12.5, route="/users/"))
+    text = format_text(report.to_dict())
+    assert "GET /users/" in text and "Slowest requests" in text and "Top error sources" in text
+
+
+def test_legacy_paths_map_onto_app_routes_and_error_sources_are_capped():
+    matcher = RouteMatcher.for_app()
+    assert matcher.template("GET", "/users/export") == "/users/export"
+    assert matcher.template("GET", "/users/42") == "/users/{user_id}"
+    assert matcher.template("GET", "/nope") == "<unmatched>"
+
+    report = LogReport(top=2, route_matcher=matcher, max_error_sources=10)
+    for _ in range(5):
+        report.add_line(json.dumps({"level": "ERROR", "name": "frequent", "message": "boom"}))
+    for i in range(100):
+        report.add_line(json.dumps({"level": "ERROR", "name": f"module{i}", "message": "boom"}))
+    assert len(report.error_sources) <= 10
+    assert report.error_sources_dropped > 0
+    assert report.to_dict()["top_error_sources"]["frequent: boom"] == 5
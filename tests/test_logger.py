@@ -0,0 +1,52 @@
+import logging
+import queue
+
+from app.logger import DroppingQueueHandler, SamplingFilter
+
+
+def _record(level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, "message %s", ("arg",), None)
+
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+    handler.handle(_record())
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+    # Formatting is deferred to the listener
+    assert handler.queue.get_nowait().args == ("arg",)
+
+
+def test_sampling_keeps_warnings():
+    sampler = SamplingFilter(rate=0.0)
+    assert not sampler.filter(_record(logging.INFO))
+    assert not sampler.filter(_record(logging.DEBUG))
+    assert sampler.filter(_record(logging.WARNING))
+    assert sampler.sampled_out == 2
+
+
+def test_records_after_stop_logging_are_not_lost(monkeypatch):
+    from app import logger as app_logger
+
+    monkeypatch.setattr(app_logger, "LOG_QUEUE_ENABLED", True)
+    log = app_logger.get_logger("pep2-backend")
+    captured = []
+    capture = logging.Handler()
+    capture.emit = captured.append
+    app_logger._listener.handlers = (*app_logger._listener.handlers, capture)
+    try:
+        app_logger.stop_logging()
+        # The queue handler is detached; records go straight to the real handlers
+        assert app_logger._queue_handler not in log.handlers
+        log.warning("after stop")
+        assert [r.getMessage() for r in captured] == ["after stop"]
+
+        # get_logger brings the background listener back
+        app_logger.get_logger("pep2-backend")
+        assert log.handlers == [app_logger._queue_handler]
+        assert app_logger._listener_running
+    finally:
+        app_logger.stop_logging()
+        app_logger._listener.handlers = tuple(h for h in app_logger._listener.handlers if h is not capture)
+        app_logger.get_logger("pep2-backend")
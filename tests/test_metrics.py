@@ -0,0 +1,43 @@
+import pytest
+from app.core.metrics import MetricsRegistry
+from app.middleware.instrumentation import RequestInstrumentationMiddleware
+from conftest import create_and_login
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    hist.observe(0.05, "/a")
+    hist.observe(0.5, "/a")
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="/a"} 2' in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_templates(api_client):
+    headers = await create_and_login(api_client)
+    await api_client.get("/users/1", headers=headers)
+
+    resp = await api_client.get("/metrics")
+    assert resp.status_code == 200
+    assert 'http_responses_total{method="GET",route="/users/{user_id}",status="200"}' in resp.text
+    assert "password_hash_queue_depth" in resp.text
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/x", "query_string": b""}
+    await RequestInstrumentationMiddleware(app, server_timing=True)(scope, None, send)
+    assert any(name == b"server-timing" for name, _ in sent[0]["headers"])
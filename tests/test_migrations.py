@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import text
+from app.database import build_engine
+from app.migrations import SCHEMA_VERSION, check_schema, upgrade
+
+
+@pytest.mark.asyncio
+async def test_upgrade_initialises_fresh_database(tmp_path):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'fresh.db'}")
+    assert not await check_schema(engine)
+    assert await upgrade(engine) == SCHEMA_VERSION
+    assert await check_schema(engine)
+    # Running it again is a no-op
+    assert await upgrade(engine) == SCHEMA_VERSION
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_upgrade_migrates_database_created_by_create_all(tmp_path):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        # The users table as the original create_all-on-startup made it
+        await conn.execute(text(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+            "email VARCHAR UNIQUE, hashed_password VARCHAR NOT NULL)"
+        ))
+        await conn.execute(text("INSERT INTO users (name, email, hashed_password) VALUES ('Old', 'old@example.com', 'x')"))
+    assert await upgrade(engine) == SCHEMA_VERSION
+    assert await check_schema(engine)
+    async with engine.connect() as conn:
+        row = (await conn.execute(text("SELECT version, updated_at FROM users"))).one()
+    assert row.version == 1 and row.updated_at is not None
+    async with engine.connect() as conn:
+        # Existing rows are indexed for search by the migration
+        matched = (await conn.execute(text("SELECT rowid FROM users_search WHERE users_search MATCH '\"old@\"'"))).all()
+    assert len(matched) == 1
+    await engine.dispose()
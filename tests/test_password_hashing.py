@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+from app.core.password_hashing import PasswordHashingPool, hash_password, verify_password
+from app.exceptions.http_exceptions import PasswordHashingBusyException
+
+
+@pytest.mark.asyncio
+async def test_pool_hashes_and_verifies():
+    pool = PasswordHashingPool("thread", workers=2, max_queue=2)
+    hashed = await pool.run(hash_password, "secret")
+    assert await pool.run(verify_password, "secret", hashed)
+    assert not await pool.run(verify_password, "wrong", hashed)
+    assert pool.stats()["completed"] == 3
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_saturated():
+    pool = PasswordHashingPool("thread", workers=1, max_queue=1)
+    release = threading.Event()
+    running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    assert pool.queue_depth == 1
+
+    with pytest.raises(PasswordHashingBusyException):
+        await pool.run(release.wait)
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(*running)
+    assert pool.pending == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_hash(sqlite_session_factory, monkeypatch):
+    from app.core import password_hashing
+    from app.repositories.user_repository import UserRepository
+    from app.services.auth_service import AuthService
+
+    old_hash = password_hashing.build_context(bcrypt_rounds=4).hash("secret")
+    monkeypatch.setattr(password_hashing, "pwd_context", password_hashing.build_context(bcrypt_rounds=5))
+    assert password_hashing.needs_update(old_hash)
+
+    async with sqlite_session_factory() as session:
+        repo = UserRepository(session)
+        user = await repo.create(name="Old", email="old@example.com", hashed_password=old_hash)
+        assert await AuthService(repo).authenticate_user("old@example.com", "secret")
+        stored = (await repo.get_by_id(user.id)).hashed_password
+    assert stored.startswith("$2b$05$")
+    assert not password_hashing.needs_update(stored)
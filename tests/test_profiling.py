@@ -0,0 +1,55 @@
+import os
+import pstats
+import time
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from app.middleware.profiling import ProfilingMiddleware, prune_profiles
+
+
+def build_client(tmp_path, **options):
+    app = FastAPI()
+
+    @app.get("/slow/{item_id}")
+    async def slow(item_id: int):
+        return {"total": sum(range(10_000))}
+
+    app.add_middleware(ProfilingMiddleware, directory=str(tmp_path), **options)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_profiles_only_requests_with_the_token(tmp_path):
+    async with build_client(tmp_path, token="s3cret", sample_rate=0) as client:
+        plain = await client.get("/slow/1")
+        wrong = await client.get("/slow/1", headers={"X-Profile": "guess"})
+        profiled = await client.get("/slow/1", headers={"X-Profile": "s3cret"})
+
+    assert "x-profile-id" not in plain.headers and "x-profile-id" not in wrong.headers
+    assert profiled.json() == {"total": 49995000}
+    files = os.listdir(tmp_path)
+    assert files == [profiled.headers["x-profile-id"] + ".prof"]
+    stats = pstats.Stats(str(tmp_path / files[0]))
+    assert any(func[2] == "slow" for func in stats.stats)
+
+
+@pytest.mark.asyncio
+async def test_sampling_without_token(tmp_path):
+    async with build_client(tmp_path, token="", sample_rate=1.0) as client:
+        resp = await client.get("/slow/2", headers={"X-Profile": ""})
+    assert resp.headers["x-profile-id"].endswith("_GET_slow_2")
+
+
+def test_prune_enforces_count_size_and_age(tmp_path):
+    now = time.time()
+    for i in range(5):
+        path = tmp_path / f"p{i}.prof"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (now - 100 + i, now - 100 + i))
+    os.utime(tmp_path / "p4.prof", (now, now))
+    os.utime(tmp_path / "p0.prof", (now - 10_000, now - 10_000))
+
+    assert prune_profiles(str(tmp_path), max_files=10, max_bytes=10_000, retention_seconds=3600) == 1
+    assert prune_profiles(str(tmp_path), max_files=3, max_bytes=10_000, retention_seconds=3600) == 1
+    assert prune_profiles(str(tmp_path), max_files=3, max_bytes=250, retention_seconds=3600) == 1
+    assert sorted(os.listdir(tmp_path)) == ["p3.prof", "p4.prof"]
@@ -0,0 +1,37 @@
+import pytest
+from app.core.rate_limit import InMemoryTokenBucketBackend, LoginRateLimiter, login_rate_limiter
+from app.exceptions.http_exceptions import TooManyLoginAttemptsException
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_per_email():
+    limiter = LoginRateLimiter(InMemoryTokenBucketBackend(), per_email=2, per_ip=100, period_seconds=60)
+    await limiter.check("a@example.com", "10.0.0.1")
+    await limiter.check("A@example.com", "10.0.0.1")
+    with pytest.raises(TooManyLoginAttemptsException) as exc_info:
+        await limiter.check("a@example.com", "10.0.0.2")
+    assert exc_info.value.headers["Retry-After"] == "30"
+    # Other emails are unaffected
+    await limiter.check("b@example.com", "10.0.0.1")
+
+
+@pytest.mark.asyncio
+async def test_login_returns_429_with_retry_after(api_client, monkeypatch):
+    monkeypatch.setattr(login_rate_limiter, "per_email", 1)
+    credentials = {"email": "nobody@example.com", "password": "wrong"}
+    first = await api_client.post("/login", json=credentials)
+    assert first.status_code == 401
+    second = await api_client.post("/login", json=credentials)
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_ip_limit_is_checked_before_charging_the_email():
+    limiter = LoginRateLimiter(InMemoryTokenBucketBackend(), per_email=2, per_ip=1, period_seconds=60)
+    await limiter.check("victim@example.com", "10.0.0.66")
+    for _ in range(5):
+        with pytest.raises(TooManyLoginAttemptsException):
+            await limiter.check("victim@example.com", "10.0.0.66")
+    # The blocked attempts didn't use up the victim's own attempts
+    await limiter.check("victim@example.com", "10.0.0.1")
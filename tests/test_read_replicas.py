@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import text
+from httpx import AsyncClient, ASGITransport
+from app import database
+from app.database import ReplicaRouter, build_engine
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+
+
+async def _marker_engine(path, name):
+    engine = build_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE marker (name TEXT)"))
+        await conn.execute(text("INSERT INTO marker VALUES (:name)"), {"name": name})
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_healthy_replica_and_fail_over(tmp_path, monkeypatch):
+    primary = await _marker_engine(tmp_path / "primary.db", "primary")
+    replica = await _marker_engine(tmp_path / "replica.db", "replica")
+    broken = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'broken.db'}")
+    router = ReplicaRouter([broken, replica], retry_seconds=60)
+    monkeypatch.setattr(database, "replica_router", router)
+    monkeypatch.setattr(database, "_engine", primary)
+
+    # The broken replica fails mid-request: the read is re-run on the primary and
+    # the replica is taken out of rotation
+    sessions = database.get_read_session()
+    session = await anext(sessions)
+    assert session.bind is broken
+    assert (await session.execute(text("SELECT name FROM marker"))).scalar() == "primary"
+    await sessions.aclose()
+    assert router.stats()["replicas_down"] == 1
+    assert router.stats()["primary_failovers"] == 1
+
+    for _ in range(2):
+        sessions = database.get_read_session()
+        session = await anext(sessions)
+        assert (await session.execute(text("SELECT name FROM marker"))).scalar() == "replica"
+        await sessions.aclose()
+
+    await primary.dispose()
+    await replica.dispose()
+    await broken.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_pins_only_the_writer(tmp_path, monkeypatch):
+    primary = await _marker_engine(tmp_path / "primary.db", "primary")
+    replica = await _marker_engine(tmp_path / "replica.db", "replica")
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter([replica]))
+    monkeypatch.setattr(database, "_engine", primary)
+
+    async def read_source() -> str:
+        sessions = database.get_read_session()
+        session = await anext(sessions)
+        name = (await session.execute(text("SELECT name FROM marker"))).scalar()
+        await sessions.aclose()
+        return name
+
+    async def endpoint(scope, receive, send):
+        if scope["path"] == "/write":
+            database.mark_primary_write()
+        body = (await read_source()).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+    app = ReadYourWritesMiddleware(endpoint, window_seconds=60)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as writer, \
+            AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as other:
+        resp = await writer.get("/write")
+        assert "pep2_primary_until" in resp.headers["set-cookie"]
+        assert (await writer.get("/read")).text == "primary"
+        assert (await other.get("/read")).text == "replica"
+
+    await primary.dispose()
+    await replica.dispose()
+
@@ -0,0 +1,37 @@
+import os
+from app import server
+
+
+def test_server_options_defaults_and_overrides():
+    options = server.server_options()
+    assert options["workers"] == (server.SERVER_WORKERS or os.cpu_count() or 1)
+    assert options["loop"] in ("uvloop", "asyncio") and options["http"] in ("httptools", "h11")
+    assert options["timeout_graceful_shutdown"] > 0
+    assert options["access_log"] is False  # requests are logged by the app's middleware
+    assert options["proxy_headers"] is server.SERVER_PROXY_HEADERS
+    assert options["forwarded_allow_ips"] == server.SERVER_FORWARDED_ALLOW_IPS
+
+    options = server.server_options(**vars(server.parse_args(["--workers", "3", "--max-requests", "1000"])))
+    assert options["workers"] == 3 and options["limit_max_requests"] == 1000
+    assert options["port"] == server.SERVER_PORT  # unset flags keep the configured value
+
+
+def test_shutdown_signal_fails_readiness_before_the_server_handler_runs():
+    import signal
+    import threading
+    from app.core.startup import StartupTimer
+
+    timer = StartupTimer(0.0)
+    timer.mark_started()
+    handled = threading.Event()
+    original_int = signal.getsignal(signal.SIGINT)
+    original = signal.signal(signal.SIGTERM, lambda signum, frame: handled.set())
+    try:
+        timer.stop_on_signals(delay_seconds=0.2)
+        signal.raise_signal(signal.SIGTERM)
+        assert not timer.ready
+        assert not handled.is_set()  # still serving during the delay
+        assert handled.wait(5)
+    finally:
+        signal.signal(signal.SIGTERM, original)
+        signal.signal(signal.SIGINT, original_int)
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = 0
+
+    async def load():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return "user"
+
+    results = await asyncio.gather(*(flight.do(1, load) for _ in range(5)))
+    assert results == ["user"] * 5
+    assert executions == 1
+    assert flight.stats() == {"in_flight": 0, "calls": 1, "coalesced": 4}
+
+    # Nothing is cached afterwards
+    await flight.do(1, load)
+    assert executions == 2
+
+
+@pytest.mark.asyncio
+async def test_followers_retry_when_leader_is_cancelled():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "ok"
+
+    leader = asyncio.create_task(flight.do("k", slow))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("k", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == "ok"
@@ -0,0 +1,52 @@
+import logging
+import pytest
+from sqlalchemy import text
+from app.core import sql_stats
+from app.database import build_engine
+from conftest import create_and_login
+
+
+@pytest.mark.asyncio
+async def test_request_scoped_counts_and_n_plus_one(tmp_path, caplog, monkeypatch):
+    monkeypatch.setattr(sql_stats, "SQL_N_PLUS_ONE_THRESHOLD", 5)
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'stats.db'}")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))  # outside any request: not counted anywhere
+
+        token = sql_stats.begin_request()
+        for user_id in range(6):
+            await conn.execute(text("SELECT :id"), {"id": user_id})
+        with caplog.at_level(logging.WARNING, logger="pep2-backend"):
+            stats = sql_stats.end_request(token, "GET /users/{user_id}")
+    await engine.dispose()
+
+    assert stats.queries == 6 and stats.seconds > 0
+    assert sql_stats.current_stats() is None
+    warning = next(r for r in caplog.records if r.getMessage() == "Possible N+1 queries")
+    assert warning.route == "GET /users/{user_id}" and warning.executions == 6
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log_redacts_parameters(tmp_path, caplog, monkeypatch):
+    monkeypatch.setattr(sql_stats, "SQL_SLOW_QUERY_MS", 1e-9)  # everything is slow
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+    with caplog.at_level(logging.WARNING, logger="pep2-backend"):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT :email"), {"email": "secret@example.com"})
+    await engine.dispose()
+
+    record = next(r for r in caplog.records if r.getMessage() == "Slow SQL query")
+    assert record.statement == "SELECT ?"
+    assert record.parameters == ["<str>"]
+    assert "secret@example.com" not in str(record.__dict__)
+
+
+@pytest.mark.asyncio
+async def test_request_log_line_includes_db_stats(api_client, sqlite_session_factory, caplog):
+    sql_stats.instrument_engine(sqlite_session_factory.kw["bind"].sync_engine)
+    headers = await create_and_login(api_client)
+    with caplog.at_level(logging.INFO, logger="pep2-backend"):
+        resp = await api_client.get("/users/1", headers=headers)
+    assert resp.status_code == 200
+    record = next(r for r in caplog.records if r.getMessage() == "HTTP request completed")
+    assert record.db_queries >= 1 and record.db_time_ms >= 0
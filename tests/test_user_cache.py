@@ -0,0 +1,34 @@
+import time
+
+import pytest
+from app.core.cache import TTLCache, user_cache, token_claims_cache
+from conftest import create_and_login
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    cache.set("short", 4, ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_served_from_cache(api_client):
+    headers = await create_and_login(api_client)
+    before_users = user_cache.stats()
+    before_tokens = token_claims_cache.stats()
+
+    first = await api_client.get("/users/1", headers=headers)
+    second = await api_client.get("/users/1", headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert user_cache.stats()["misses"] - before_users["misses"] == 1
+    assert user_cache.stats()["hits"] - before_users["hits"] == 1
+    assert token_claims_cache.stats()["hits"] - before_tokens["hits"] == 1
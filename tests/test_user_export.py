@@ -0,0 +1,51 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from app.models.user_orm import UserORM
+from app.repositories.user_repository import UserRepository
+from conftest import create_and_login
+
+
+async def seed(session_factory, count):
+    async with session_factory() as session:
+        session.add_all(
+            UserORM(name=f"User, {i}", email=f"user{i}@example.com", hashed_password="x") for i in range(count)
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_stream_rows_yields_batches_in_id_order(sqlite_session_factory):
+    await seed(sqlite_session_factory, 25)
+    async with sqlite_session_factory() as session:
+        batches = [rows async for rows in UserRepository(session).stream_rows(batch_size=10)]
+    assert [len(rows) for rows in batches] == [10, 10, 5]
+    assert [row["id"] for rows in batches for row in rows] == list(range(1, 26))
+    assert set(batches[0][0]) == {"id", "name", "email"}  # never the password hash
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_csv_and_gzip(api_client, sqlite_session_factory):
+    headers = await create_and_login(api_client)
+    await seed(sqlite_session_factory, 3)
+
+    resp = await api_client.get("/users/export", headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["email"] for r in rows] == ["alice@example.com"] + [f"user{i}@example.com" for i in range(3)]
+
+    resp = await api_client.get("/users/export", params={"format": "csv"}, headers=headers)
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert rows[1] == {"id": "2", "name": "User, 0", "email": "user0@example.com"}
+
+    params = {"format": "csv", "gzip": True}
+    async with api_client.stream("GET", "/users/export", params=params, headers=headers) as resp:
+        assert resp.headers["content-encoding"] == "gzip"
+        raw = b"".join([chunk async for chunk in resp.aiter_raw()])
+    assert gzip.decompress(raw).decode().startswith("id,name,email\n1,Alice,")
+
+    resp = await api_client.get("/users/export")
+    assert resp.status_code in (401, 403)
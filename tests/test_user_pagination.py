@@ -0,0 +1,75 @@
+import pytest
+from app.core.pagination import encode_cursor, decode_cursor
+from app.exceptions.http_exceptions import InvalidCursorException
+from app.models.user_orm import UserORM
+from conftest import create_and_login
+
+
+def test_cursor_round_trip_and_tampering():
+    assert decode_cursor(encode_cursor(42)) == 42
+    with pytest.raises(InvalidCursorException):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_list_users_pages_by_id(api_client, sqlite_session_factory):
+    headers = await create_and_login(api_client)
+    async with sqlite_session_factory() as session:
+        session.add_all(
+            UserORM(name=f"User {i}", email=f"user{i}@example.com", hashed_password="x") for i in range(4)
+        )
+        await session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = await api_client.get("/users/", params=params, headers=headers)
+        assert resp.status_code == 200
+        # The body is a bare array; the cursor travels in headers
+        seen += [u["id"] for u in resp.json()]
+        cursor = resp.headers.get("x-next-cursor")
+        if cursor is None:
+            assert "link" not in resp.headers
+            break
+        assert resp.headers["link"] == f'</users/?limit=2&cursor={cursor}>; rel="next"'
+    assert seen == [1, 2, 3, 4, 5]
+
+    resp = await api_client.get("/users/", params={"name": "USER", "email": "user2@example.com"}, headers=headers)
+    assert [u["email"] for u in resp.json()] == ["user2@example.com"]
+    resp = await api_client.get("/users/", params={"name": "user_"}, headers=headers)
+    assert resp.json() == []  # LIKE wildcards in the prefix are literal
+
+    resp = await api_client.get("/users/", params={"cursor": "garbage"}, headers=headers)
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_fast_json_path_matches_default(api_client, monkeypatch):
+    import app.routers.user as user_router
+
+    headers = await create_and_login(api_client)
+    default = await api_client.get("/users/", params={"limit": 1}, headers=headers)
+    monkeypatch.setattr(user_router, "FAST_JSON_RESPONSES", True)
+    fast = await api_client.get("/users/", params={"limit": 1}, headers=headers)
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.json() == default.json()
+    assert fast.headers["x-next-cursor"] == default.headers["x-next-cursor"]
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_keeps_request_order(api_client, sqlite_session_factory):
+    headers = await create_and_login(api_client)
+    async with sqlite_session_factory() as session:
+        session.add(UserORM(name="Bob", email="bob@example.com", hashed_password="x"))
+        await session.commit()
+
+    resp = await api_client.post("/users/lookup", json={"ids": [2, 99, 1, 2]}, headers=headers)
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [(r["id"], r["found"]) for r in results] == [(2, True), (99, False), (1, True), (2, True)]
+    assert results[0]["user"]["email"] == "bob@example.com"
+    assert results[1]["user"] is None
+
+    too_many = await api_client.post("/users/lookup", json={"ids": list(range(1000))}, headers=headers)
+    assert too_many.status_code == 422
@@ -1,5 +1,8 @@
+import asyncio
+
 import pytest
 from app.models.user import User
+from app.repositories.user_repository import UserRepository
 
 @pytest.mark.asyncio
 async def test_add_and_get_all_users(user_repository):
@@ -8,3 +11,20 @@ async def test_add_and_get_all_users(user_repository):
     users = await user_repository.get_all_users()
     assert len(users) == 1
     assert users[0].email == "test@example.com"
+
+
+@pytest.mark.asyncio
+async def test_create_returns_none_for_duplicate_email(sqlite_session_factory):
+    async with sqlite_session_factory() as session:
+        repo = UserRepository(session)
+        created = await repo.create(name="Dup", email="dup@example.com", hashed_password="x")
+        assert created.id is not None
+        assert await repo.create(name="Dup 2", email="dup@example.com", hashed_password="y") is None
+        assert (await repo.get_by_email("dup@example.com")).name == "Dup"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_signups_with_same_email(api_client):
+    payload = {"name": "Race", "email": "race@example.com", "password": "pw"}
+    responses = await asyncio.gather(*(api_client.post("/users/", json=payload) for _ in range(3)))
+    assert sorted(r.status_code for r in responses) == [201, 400, 400]
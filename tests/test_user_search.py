@@ -0,0 +1,54 @@
+import pytest
+from app.models.user_orm import UserORM
+from app.repositories.user_repository import UserRepository
+from conftest import create_and_login
+
+
+async def seed(session_factory):
+    async with session_factory() as session:
+        session.add_all([
+            UserORM(name="Ada Lovelace", email="ada@analytical.org", hashed_password="x"),
+            UserORM(name="Grace Hopper", email="grace@navy.mil", hashed_password="x"),
+            UserORM(name="Alan Turing", email="alan@bletchley.uk", hashed_password="x"),
+            UserORM(name='Quote "Lovelace" 100%', email="quote@example.com", hashed_password="x"),
+        ])
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_search_matches_name_and_email_substrings(sqlite_session_factory):
+    await seed(sqlite_session_factory)
+    async with sqlite_session_factory() as session:
+        repo = UserRepository(session)
+        assert [u.name for u in await repo.search("LOVE", 10)] == ["Ada Lovelace", 'Quote "Lovelace" 100%']
+        assert [u.email for u in await repo.search("navy", 10)] == ["grace@navy.mil"]
+        assert [u.email for u in await repo.search('"Lovelace"', 10)] == ["quote@example.com"]
+        assert [u.email for u in await repo.search("100%", 10)] == ["quote@example.com"]
+        assert await repo.search("nobody", 10) == []
+
+        user = (await repo.search("Turing", 10))[0]
+        user.name = "Alan M. Turing"
+        await session.commit()
+        assert await repo.search("Alan Turing", 10) == []
+        assert [u.id for u in await repo.search("M. Tur", 10)] == [user.id]
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_pages_results(api_client, sqlite_session_factory):
+    headers = await create_and_login(api_client)
+    await seed(sqlite_session_factory)
+
+    resp = await api_client.get("/users/search", params={"q": "an"}, headers=headers)
+    assert resp.status_code == 422  # shorter than a trigram
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "ace", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = await api_client.get("/users/search", params=params, headers=headers)
+        assert resp.status_code == 200
+        page = resp.json()
+        seen += [u["name"] for u in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["Ada Lovelace", "Grace Hopper", 'Quote "Lovelace" 100%']